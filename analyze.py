@@ -5,28 +5,40 @@ from __future__ import annotations
 
 import argparse
 import csv
-from dataclasses import dataclass
+import math
+from array import array
+from io import BytesIO
 from pathlib import Path
+from typing import NamedTuple
 
+import numpy as np
+import pandas as pd
 
-def pct(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    ordered = sorted(values)
-    if len(ordered) == 1:
-        return ordered[0]
-    idx = (len(ordered) - 1) * p
-    lo = int(idx)
-    hi = min(lo + 1, len(ordered) - 1)
-    frac = idx - lo
-    return ordered[lo] * (1.0 - frac) + ordered[hi] * frac
+TAIL_CHUNK_BYTES = 4 * 1024 * 1024
 
 
-@dataclass
-class ParsedRow:
-    capture_time_utc: str
-    age_ms: float
-    e2e_since_sub_ms: float | None
+def pcts(values: np.ndarray, ps: list[float]) -> np.ndarray:
+    n = values.size
+    if n == 0:
+        return np.zeros(len(ps))
+    pos = (n - 1) * np.asarray(ps, dtype=np.float64)
+    lo = pos.astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    # Select only the order statistics we interpolate between, all in one partition.
+    part = np.partition(values, np.unique(np.concatenate((lo, hi))))
+    frac = pos - lo
+    return part[lo] * (1.0 - frac) + part[hi] * frac
+
+
+class Samples(NamedTuple):
+    """Parallel per-row columns; e2e_since_sub_ms is NaN where unknown."""
+
+    capture_time_utc: np.ndarray
+    age_ms: np.ndarray
+    e2e_since_sub_ms: np.ndarray
+
+    def tail(self, start: int) -> Samples:
+        return Samples(*(col[start:] for col in self))
 
 
 def parse_float_cell(row: list[str], idx: int) -> float | None:
@@ -36,70 +48,182 @@ def parse_float_cell(row: list[str], idx: int) -> float | None:
         return None
 
 
-def parse_row(header: list[str], row: list[str], prefer_adjusted: bool) -> ParsedRow | None:
+def column_index(header: list[str], name: str) -> int:
+    return header.index(name) if name in header else -1
+
+
+def parse_row(
+    adj_idx: int,
+    legacy_idx: int,
+    e2e_idx: int,
+    row: list[str],
+    prefer_adjusted: bool,
+) -> tuple[str, float, float] | None:
     if not row:
         return None
 
     capture_time = row[0] if row else ""
-    e2e = None
-    if "e2e_since_sub_ms" in header:
-        e2e = parse_float_cell(row, header.index("e2e_since_sub_ms"))
+    # Missing e2e is NaN, which the vectorized run split skips like any gap.
+    e2e_cell: float | None = None
+    if e2e_idx >= 0:
+        e2e_cell = parse_float_cell(row, e2e_idx)
     elif len(row) >= 12:
         # Mixed legacy/new rows: e2e is only present in the new 12-column shape.
-        e2e = parse_float_cell(row, len(row) - 1)
+        e2e_cell = parse_float_cell(row, len(row) - 1)
+    e2e = math.nan if e2e_cell is None else e2e_cell
 
     # New schema, correct header.
-    if "adjusted_age_ms" in header:
-        age = parse_float_cell(row, header.index("adjusted_age_ms"))
+    if adj_idx >= 0:
+        age = parse_float_cell(row, adj_idx)
         if age is None:
             return None
-        return ParsedRow(capture_time_utc=capture_time, age_ms=age, e2e_since_sub_ms=e2e)
+        return capture_time, age, e2e
 
     # Legacy header + new rows appended (mixed file): adjusted_age_ms is at index 10.
     if len(row) >= 12:
         age = parse_float_cell(row, 10)
         if age is None:
             return None
-        return ParsedRow(capture_time_utc=capture_time, age_ms=age, e2e_since_sub_ms=e2e)
+        return capture_time, age, e2e
 
     if prefer_adjusted:
         return None
 
     # Legacy schema fallback.
-    if "data_age_ms" in header:
-        age = parse_float_cell(row, header.index("data_age_ms"))
+    if legacy_idx >= 0:
+        age = parse_float_cell(row, legacy_idx)
         if age is None:
             return None
-        return ParsedRow(capture_time_utc=capture_time, age_ms=age, e2e_since_sub_ms=e2e)
+        return capture_time, age, e2e
 
     return None
 
 
-def classify_regime(value: float, normal_max: float, degraded_max: float) -> str:
-    if value <= normal_max:
-        return "normal"
-    if value <= degraded_max:
-        return "degraded"
-    return "unsafe"
+REGIMES = ("normal", "degraded", "unsafe")
 
 
-def split_runs(rows: list[ParsedRow]) -> list[list[ParsedRow]]:
-    if not rows:
+def count_regimes(ages: np.ndarray, normal_max: float, degraded_max: float) -> dict[str, int]:
+    # side="left" buckets value == edge into the lower regime, matching `<=` bounds.
+    edges = np.array([normal_max, degraded_max], dtype=np.float64)
+    counts = np.bincount(np.searchsorted(edges, ages, side="left"), minlength=len(REGIMES))
+    return {name: int(c) for name, c in zip(REGIMES, counts)}
+
+
+def split_runs(e2e: np.ndarray) -> np.ndarray:
+    """Return the start index of each run; the latest run is ``[starts[-1]:]``."""
+    if e2e.size == 0:
+        return np.empty(0, dtype=np.intp)
+    # Only rows with a known e2e take part in the comparison, so gaps never split a run.
+    idx = np.flatnonzero(np.isfinite(e2e))
+    breaks = idx[np.flatnonzero(np.diff(e2e[idx]) < -1e-6) + 1]
+    return np.concatenate(([0], breaks))
+
+
+def read_header(path: Path) -> list[str]:
+    try:
+        return [str(c) for c in pd.read_csv(path, nrows=0).columns]
+    except pd.errors.EmptyDataError:
         return []
-    runs: list[list[ParsedRow]] = []
-    current: list[ParsedRow] = []
-    prev_e2e: float | None = None
-    for row in rows:
-        e2e = row.e2e_since_sub_ms
-        if current and e2e is not None and prev_e2e is not None and e2e + 1e-6 < prev_e2e:
-            runs.append(current)
-            current = []
-        current.append(row)
-        if e2e is not None:
-            prev_e2e = e2e
-    if current:
-        runs.append(current)
-    return runs
+
+
+def has_current_schema(header: list[str]) -> bool:
+    return "adjusted_age_ms" in header and "e2e_since_sub_ms" in header
+
+
+def read_current_schema(
+    source: Path | BytesIO, header: list[str], has_header_row: bool = True
+) -> Samples:
+    # Current collector schema: let the C parser pull the three columns directly.
+    df = pd.read_csv(
+        source,
+        header=0 if has_header_row else None,
+        names=None if has_header_row else header,
+        usecols=[header[0], "adjusted_age_ms", "e2e_since_sub_ms"],
+        dtype={header[0]: "string"},
+        # An over-wide first row (torn line glued to the next) must not become an implicit
+        # index that shifts every column left.
+        index_col=False,
+        engine="c",
+        low_memory=False,
+        on_bad_lines="skip",
+    )
+    age = pd.to_numeric(df["adjusted_age_ms"], errors="coerce").to_numpy(dtype=np.float64)
+    e2e = pd.to_numeric(df["e2e_since_sub_ms"], errors="coerce").to_numpy(dtype=np.float64)
+    capture = df[header[0]].fillna("").to_numpy(dtype=object)
+    keep = ~np.isnan(age)
+    return Samples(capture[keep], age[keep], e2e[keep])
+
+
+def load_latest_run(
+    path: Path, header: list[str], chunk_bytes: int = TAIL_CHUNK_BYTES
+) -> tuple[Samples, np.ndarray, bool]:
+    """Parse only as much of the file tail as needed to contain the latest run.
+
+    Returns the parsed tail, its run start indices and whether the whole file was read (in which
+    case the run count is exact rather than a lower bound).
+    """
+    size = path.stat().st_size
+    span = chunk_bytes
+    with path.open("rb") as f:
+        data_start = len(f.readline())
+        while True:
+            start = max(data_start, size - span)
+            if start > data_start:
+                # Read from one byte early so a seek landing on a line start keeps that line,
+                # then drop the partial line the seek landed in.
+                f.seek(start - 1)
+                data = f.read(size - start + 1)
+                data = data[data.find(b"\n") + 1 :]
+            else:
+                f.seek(start)
+                data = f.read(size - start)
+            try:
+                samples = read_current_schema(BytesIO(data), header, has_header_row=False)
+            except (pd.errors.EmptyDataError, pd.errors.ParserError, ValueError):
+                # No row pandas can align with the header, e.g. only a torn last line.
+                empty = np.empty(0, dtype=np.float64)
+                samples = Samples(np.empty(0, dtype=object), empty, empty)
+            starts = split_runs(samples.e2e_since_sub_ms)
+            if starts.size > 1 or start == data_start:
+                return samples, starts, start == data_start
+            span *= 2
+
+
+def load_samples(path: Path, header: list[str]) -> Samples:
+    if has_current_schema(header):
+        return read_current_schema(path, header)
+
+    # Legacy and mixed legacy/new files have ragged rows, so stream them row by row.
+    adj_idx = column_index(header, "adjusted_age_ms")
+    legacy_idx = column_index(header, "data_age_ms")
+    e2e_idx = column_index(header, "e2e_since_sub_ms")
+    prefer_adjusted = adj_idx >= 0
+    captures: list[str] = []
+    ages = array("d")
+    e2es = array("d")
+    with path.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if not prefer_adjusted and len(row) >= 12:
+                # First new-shape row in a legacy-header file: the file holds adjusted
+                # samples, so legacy rows collected so far are discarded.
+                prefer_adjusted = True
+                captures.clear()
+                del ages[:]
+                del e2es[:]
+            parsed = parse_row(adj_idx, legacy_idx, e2e_idx, row, prefer_adjusted=prefer_adjusted)
+            if parsed is None:
+                continue
+            capture_time, age, e2e = parsed
+            captures.append(capture_time)
+            ages.append(age)
+            e2es.append(e2e)
+    return Samples(
+        np.array(captures, dtype=object),
+        np.frombuffer(ages, dtype=np.float64),
+        np.frombuffer(e2es, dtype=np.float64),
+    )
 
 
 def main() -> int:
@@ -132,59 +256,56 @@ def main() -> int:
         print(f"file not found: {path}")
         return 1
 
-    parsed_rows: list[ParsedRow] = []
-    with path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        if not header:
-            print("empty file")
-            return 1
-        rows = list(reader)
-
-    has_adjusted_rows = "adjusted_age_ms" in header or any(len(r) >= 12 for r in rows)
-    for row in rows:
-        parsed = parse_row(header, row, prefer_adjusted=has_adjusted_rows)
-        if parsed is not None:
-            parsed_rows.append(parsed)
-
-    if not parsed_rows:
+    header = read_header(path)
+    if not header:
+        print("empty file")
+        return 1
+
+    if args.all_runs or not has_current_schema(header):
+        samples = load_samples(path, header)
+        run_starts = split_runs(samples.e2e_since_sub_ms)
+        runs_exact = True
+    else:
+        # Latest-run mode only needs the file tail back to the last run boundary.
+        samples, run_starts, runs_exact = load_latest_run(path, header)
+    if samples.age_ms.size == 0:
         print("no valid samples")
         return 1
 
-    runs = split_runs(parsed_rows)
-    selected = parsed_rows if args.all_runs else runs[-1]
-    ages = [r.age_ms for r in selected]
+    selected = samples if args.all_runs else samples.tail(int(run_starts[-1]))
+    ages = selected.age_ms
 
-    if not ages:
+    if ages.size == 0:
         print("no valid samples")
         return 1
 
-    p95 = pct(ages, 0.95)
-    p99 = pct(ages, 0.99)
+    # The 0 and 1 quantiles are min and max, so one selection pass covers all order stats.
+    age_min, p50, p95, p99, age_max = (
+        float(q) for q in pcts(ages, [0.0, 0.50, 0.95, 0.99, 1.0])
+    )
+    age_mean = float(ages.mean())
     normal_max = p95 if args.normal_max_ms is None else args.normal_max_ms
     degraded_max = p99 if args.degraded_max_ms is None else args.degraded_max_ms
     if degraded_max < normal_max:
         print("invalid thresholds: degraded-max-ms must be >= normal-max-ms")
         return 1
 
-    regime_counts = {"normal": 0, "degraded": 0, "unsafe": 0}
-    for age in ages:
-        regime_counts[classify_regime(age, normal_max, degraded_max)] += 1
+    regime_counts = count_regimes(ages, normal_max, degraded_max)
 
-    n = len(ages)
+    n = int(ages.size)
     if args.all_runs:
-        print(f"runs_detected={len(runs)} mode=all_runs")
+        print(f"runs_detected={run_starts.size} mode=all_runs")
     else:
-        print(f"runs_detected={len(runs)} mode=latest_run")
-        print(f"latest_run_start={selected[0].capture_time_utc}")
-        print(f"latest_run_end={selected[-1].capture_time_utc}")
+        print(f"runs_detected{'=' if runs_exact else '>='}{run_starts.size} mode=latest_run")
+        print(f"latest_run_start={selected.capture_time_utc[0]}")
+        print(f"latest_run_end={selected.capture_time_utc[-1]}")
     print(f"samples={n}")
-    print(f"age_ms min={min(ages):.3f}")
-    print(f"age_ms p50={pct(ages, 0.50):.3f}")
+    print(f"age_ms min={age_min:.3f}")
+    print(f"age_ms p50={p50:.3f}")
     print(f"age_ms p95={p95:.3f}")
     print(f"age_ms p99={p99:.3f}")
-    print(f"age_ms max={max(ages):.3f}")
-    print(f"age_ms mean={sum(ages) / n:.3f}")
+    print(f"age_ms max={age_max:.3f}")
+    print(f"age_ms mean={age_mean:.3f}")
     print(f"regime normal <= {normal_max:.3f} ms")
     print(f"regime degraded <= {degraded_max:.3f} ms")
     print(f"regime unsafe > {degraded_max:.3f} ms")
@@ -196,7 +317,6 @@ def main() -> int:
         f"regime_share normal={regime_counts['normal'] / n:.2%} "
         f"degraded={regime_counts['degraded'] / n:.2%} unsafe={regime_counts['unsafe'] / n:.2%}"
     )
-    p50 = pct(ages, 0.50)
     if p50 > 250.0:
         print(
             "warning: p50 is very high (>250ms). Check for wrong file/run, stale clocks, "
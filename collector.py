@@ -5,22 +5,48 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import calendar
 import csv
+import io
 import json
+import logging
+import queue
 import signal
-import statistics
 import sys
+import threading
 import time
-from collections import deque
-from dataclasses import dataclass
+from contextlib import closing
 from datetime import UTC, datetime
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Literal
 
+import msgspec
+import numpy as np
 import websockets
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json handles the same payloads.
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (and POSIX-only); the default asyncio loop works too.
+    uvloop = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both.
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def json_dumps(obj: Any) -> str:
+    # Subscribe payloads go out as text frames, so orjson's bytes are decoded.
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj)
+
 
 KRAKEN_WS_V2 = "wss://ws.kraken.com/v2"
+log = logging.getLogger("mm_core.collector")
 CSV_HEADER = [
     "capture_time_utc",
     "recv_ts_ms",
@@ -37,26 +63,51 @@ CSV_HEADER = [
 ]
 
 
-@dataclass
-class LatencySample:
-    exchange_ts_ms: float
-    recv_ts_ms: float
-    raw_age_ms: float
-    adjusted_age_ms: float
-    e2e_since_sub_ms: float
+def epoch_ms() -> float:
+    return time.time_ns() / 1_000_000.0
+
 
+_iso_prefix_sec = -1
+_iso_prefix = ""
 
-def utc_iso_now() -> str:
-    return datetime.now(tz=UTC).isoformat()
 
+def _fast_iso(secs: int, micros: int) -> str:
+    # Bursts land within the same second, so only the microsecond suffix changes.
+    global _iso_prefix_sec, _iso_prefix
+    if secs != _iso_prefix_sec:
+        _iso_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(secs))
+        _iso_prefix_sec = secs
+    return f"{_iso_prefix}.{micros:06d}+00:00"
+
+
+def now_iso_and_ms() -> tuple[str, float]:
+    # One clock read gives both the CSV capture time and the receive timestamp.
+    ns = time.time_ns()
+    secs, rem_ns = divmod(ns, 1_000_000_000)
+    return _fast_iso(secs, rem_ns // 1000), ns / 1_000_000.0
 
-def epoch_ms() -> float:
-    return time.time_ns() / 1_000_000.0
+
+@lru_cache(maxsize=8)
+def _utc_midnight_s(year: int, month: int, day: int) -> int:
+    return calendar.timegm((year, month, day, 0, 0, 0))
+
+
+def parse_kraken_ts(value: str) -> float:
+    """Parse Kraken's fixed ``YYYY-MM-DDTHH:MM:SS.ffffffZ`` shape into epoch ms."""
+    if len(value) != 27 or value[26] != "Z" or value[10] != "T" or value[19] != ".":
+        raise ValueError(f"unexpected timestamp shape: {value!r}")
+    day_s = _utc_midnight_s(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    secs = day_s + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+    return secs * 1000.0 + int(value[20:26]) / 1000.0
 
 
 def parse_exchange_ts_ms(value: str | None) -> float | None:
     if not value:
         return None
+    try:
+        return parse_kraken_ts(value)
+    except ValueError:
+        pass
     normalized = value.replace("Z", "+00:00")
     try:
         return datetime.fromisoformat(normalized).timestamp() * 1000.0
@@ -64,43 +115,57 @@ def parse_exchange_ts_ms(value: str | None) -> float | None:
         return None
 
 
-def pct(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    ordered = sorted(values)
-    if len(ordered) == 1:
-        return ordered[0]
-    idx = (len(ordered) - 1) * p
-    lo = int(idx)
-    hi = min(lo + 1, len(ordered) - 1)
-    if lo == hi:
-        return ordered[lo]
-    frac = idx - lo
-    return ordered[lo] * (1.0 - frac) + ordered[hi] * frac
+def pcts(values: np.ndarray, ps: list[float]) -> np.ndarray:
+    n = values.size
+    if n == 0:
+        return np.zeros(len(ps))
+    pos = (n - 1) * np.asarray(ps, dtype=np.float64)
+    lo = pos.astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    # Select only the order statistics we interpolate between, all in one partition.
+    part = np.partition(values, np.unique(np.concatenate((lo, hi))))
+    frac = pos - lo
+    return part[lo] * (1.0 - frac) + part[hi] * frac
 
 
 class RollingStats:
     def __init__(self, maxlen: int = 50_000) -> None:
-        self.samples: deque[LatencySample] = deque(maxlen=maxlen)
+        # Fixed-size ring of adjusted ages; summary stats do not depend on sample order.
+        self._ages = np.empty(maxlen, dtype=np.float64)
+        self._maxlen = maxlen
+        self._head = 0
+        self._len = 0
+        self._sum = 0.0
         self.msg_count_total = 0
-        self.window_start_ms = epoch_ms()
-
-    def add(self, sample: LatencySample) -> None:
-        self.samples.append(sample)
+        self.window_start_ns = time.monotonic_ns()
+
+    def add(self, age: float) -> None:
+        if self._len == self._maxlen:
+            self._sum -= self._ages[self._head]
+        else:
+            self._len += 1
+        self._ages[self._head] = age
+        self._sum += age
+        self._head += 1
+        if self._head == self._maxlen:
+            self._head = 0
+            # Re-sum once per full lap so add/subtract rounding error cannot accumulate.
+            self._sum = float(self._ages.sum())
         self.msg_count_total += 1
 
     def summary(self) -> dict[str, float]:
-        ages = [s.adjusted_age_ms for s in self.samples]
-        elapsed_s = max((epoch_ms() - self.window_start_ms) / 1000.0, 1e-6)
+        ages = self._ages[: self._len]
+        elapsed_s = max((time.monotonic_ns() - self.window_start_ns) / 1e9, 1e-6)
+        age_min, p50, p95, p99, age_max = pcts(ages, [0.0, 0.50, 0.95, 0.99, 1.0])
         return {
-            "count_window": float(len(ages)),
+            "count_window": float(ages.size),
             "msg_rate_per_s": self.msg_count_total / elapsed_s,
-            "age_ms_min": min(ages) if ages else 0.0,
-            "age_ms_mean": statistics.fmean(ages) if ages else 0.0,
-            "age_ms_p50": pct(ages, 0.50),
-            "age_ms_p95": pct(ages, 0.95),
-            "age_ms_p99": pct(ages, 0.99),
-            "age_ms_max": max(ages) if ages else 0.0,
+            "age_ms_min": float(age_min),
+            "age_ms_mean": self._sum / self._len if self._len else 0.0,
+            "age_ms_p50": float(p50),
+            "age_ms_p95": float(p95),
+            "age_ms_p99": float(p99),
+            "age_ms_max": float(age_max),
         }
 
 
@@ -141,19 +206,105 @@ def ensure_csv(path: Path) -> None:
         writer.writerow(CSV_HEADER)
 
 
-def parse_ticker_event(message: dict[str, Any]) -> dict[str, Any] | None:
-    if message.get("channel") != "ticker":
-        return None
-    msg_type = message.get("type")
-    if msg_type not in {"snapshot", "update"}:
-        return None
-    data = message.get("data")
-    if not isinstance(data, list) or not data:
-        return None
-    row = data[0]
-    if not isinstance(row, dict):
+class BatchedCsvWriter:
+    """Collect preformatted CSV lines in memory and write them to a binary file in batches.
+
+    Batches are written by a background thread, so a slow disk never stalls websocket receive;
+    the loop only blocks once ``max_queued_batches`` are waiting on the disk.
+    """
+
+    def __init__(
+        self,
+        f: BinaryIO,
+        max_rows: int = 256,
+        max_age_ms: float = 1000.0,
+        max_queued_batches: int = 64,
+    ) -> None:
+        self._f = f
+        self._row_buf = io.StringIO()
+        self._row_writer = csv.writer(self._row_buf)
+        self._pending: list[str] = []
+        self._max_rows = max_rows
+        self._max_age_ms = max_age_ms
+        self._last_flush_ms = epoch_ms()
+        self._batches: queue.Queue[bytes | None] = queue.Queue(maxsize=max_queued_batches)
+        self._error: OSError | None = None
+        self._thread = threading.Thread(target=self._drain, name="csv-writer", daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while (batch := self._batches.get()) is not None:
+            if self._error is not None:
+                continue  # Keep consuming so producers never block on a dead writer.
+            try:
+                self._f.write(batch)
+                self._f.flush()
+            except OSError as exc:
+                self._error = exc
+
+    def write_line(self, line: str, now_ms: float) -> None:
+        # now_ms is the caller's per-frame timestamp, so batching costs no extra clock read.
+        self._pending.append(line)
+        if (
+            len(self._pending) >= self._max_rows
+            or now_ms - self._last_flush_ms >= self._max_age_ms
+        ):
+            self.flush(now_ms)
+
+    def writerow(self, row: list[Any], now_ms: float) -> None:
+        # Slow path for rows whose cells need csv quoting.
+        self._row_buf.seek(0)
+        self._row_buf.truncate()
+        self._row_writer.writerow(row)
+        self.write_line(self._row_buf.getvalue(), now_ms)
+
+    def flush(self, now_ms: float | None = None) -> None:
+        if self._error is not None:
+            raise self._error
+        if self._pending:
+            # One encode per batch; the file is opened in binary mode, skipping the text layer.
+            self._batches.put("".join(self._pending).encode())
+            self._pending.clear()
+        self._last_flush_ms = epoch_ms() if now_ms is None else now_ms
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._batches.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+class TickerRow(msgspec.Struct):
+    bid: float
+    ask: float
+    bid_qty: float
+    ask_qty: float
+    timestamp: str
+    # Optional in the frame; an empty value falls back to the subscribed symbol.
+    symbol: str = ""
+
+
+class TickerFrame(msgspec.Struct):
+    channel: Literal["ticker"]
+    type: Literal["snapshot", "update"]
+    data: list[TickerRow]
+
+
+_ticker_decoder = msgspec.json.Decoder(TickerFrame)
+
+
+def decode_ticker(raw: str | bytes) -> TickerRow | None:
+    # Ticker frames decode straight into typed structs, with channel/type checked
+    # by the decoder; anything else (acks, heartbeats, status) fails validation and
+    # is left to the generic JSON path.
+    try:
+        frame = _ticker_decoder.decode(raw)
+    except msgspec.ValidationError:
         return None
-    return row
+    return frame.data[0] if frame.data else None
 
 
 def validate_clock_offset(
@@ -171,6 +322,44 @@ def validate_clock_offset(
     return candidate_offset_ms, "accepted"
 
 
+class ClockOffsetFilter:
+    """Exponentially weighted clock offset estimate with a variance gate for outliers."""
+
+    def __init__(self, alpha: float = 0.25, k_sigma: float = 3.0, min_samples: int = 4) -> None:
+        self.alpha = alpha
+        self.k_sigma = k_sigma
+        self.min_samples = min_samples
+        self.mean: float | None = None
+        self.var = 0.0
+        self.n = 0
+
+    def update(
+        self, candidate_offset_ms: float, max_abs_clock_offset_ms: float, max_offset_jump_ms: float
+    ) -> tuple[float | None, str]:
+        accepted, reason = validate_clock_offset(
+            candidate_offset_ms=candidate_offset_ms,
+            last_good_offset_ms=self.mean,
+            max_abs_clock_offset_ms=max_abs_clock_offset_ms,
+            max_offset_jump_ms=max_offset_jump_ms,
+        )
+        if accepted is None:
+            return None, reason
+        if self.mean is None:
+            self.mean = accepted
+            self.n = 1
+            return self.mean, reason
+        delta = accepted - self.mean
+        gated = self.n >= self.min_samples and delta * delta > self.k_sigma**2 * self.var
+        # Gated residuals still widen the variance, so a persistent shift is eventually let
+        # through instead of being rejected forever.
+        self.var = (1.0 - self.alpha) * (self.var + self.alpha * delta * delta)
+        if gated:
+            return None, "rejected_sigma"
+        self.mean += self.alpha * delta
+        self.n += 1
+        return self.mean, reason
+
+
 async def run_collector(
     symbol: str,
     out_csv: Path,
@@ -185,75 +374,87 @@ async def run_collector(
     ensure_csv(out_csv)
     stats = RollingStats()
     stop_event = asyncio.Event()
-    session_start_ms = epoch_ms()
+    # Interval timers use integer monotonic ns: immune to NTP steps, no float math per frame.
+    session_start_ns = time.monotonic_ns()
     reconnect_attempt = 0
-    last_good_offset_ms: float | None = None
+    offset_filter = ClockOffsetFilter()
+    # Consecutive BBO updates often share a timestamp (qty-only changes); reuse its parse.
+    last_ts: str | None = None
+    last_ts_ms: float | None = None
 
-    def _stop_handler(*_: Any) -> None:
-        stop_event.set()
-
-    signal.signal(signal.SIGINT, _stop_handler)
+    loop = asyncio.get_running_loop()
+    stop_signals = [signal.SIGINT]
     if hasattr(signal, "SIGTERM"):
-        signal.signal(signal.SIGTERM, _stop_handler)
-
-    print(f"[{utc_iso_now()}] starting collector out={out_csv}")
-    next_summary_ts = time.monotonic() + summary_every_s
-    with out_csv.open("a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
+        stop_signals.append(signal.SIGTERM)
+    for sig in stop_signals:
+        try:
+            # Delivered through the loop's self-pipe, so the event is set on the loop thread.
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows loops lack add_signal_handler; wake the loop from a plain handler instead.
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop_event.set))
+
+    log.info(f"starting collector out={out_csv}")
+    summary_every_ns = int(summary_every_s * 1e9)
+    max_run_ns = None if max_seconds is None else int(max_seconds * 1e9)
+    offset_refresh_ns = int(offset_refresh_seconds * 1e9)
+    next_summary_ns = session_start_ns + summary_every_ns
+    with (
+        out_csv.open("ab", buffering=1 << 20) as f,
+        closing(BatchedCsvWriter(f)) as writer,
+    ):
         while not stop_event.is_set():
-            if max_seconds is not None and (epoch_ms() - session_start_ms) / 1000.0 >= max_seconds:
+            if max_run_ns is not None and time.monotonic_ns() - session_start_ns >= max_run_ns:
                 stop_event.set()
                 break
 
             clock_offset_ms = 0.0
             clock_offset_ready = False
-            clock_offset_set_ms: float | None = None
             sub_send_ms = 0.0
             try:
-                print(f"[{utc_iso_now()}] connecting ws={ws_url} symbol={symbol}")
-                async with websockets.connect(ws_url, ping_interval=15, ping_timeout=15) as ws:
-                    connection_open_ms = epoch_ms()
+                log.info(f"connecting ws={ws_url} symbol={symbol}")
+                # Ticker frames are tiny, so permessage-deflate costs CPU for no gain; a short
+                # receive queue keeps backpressure on the socket instead of buffering stale frames.
+                async with websockets.connect(
+                    ws_url,
+                    ping_interval=15,
+                    ping_timeout=15,
+                    compression=None,
+                    max_size=2**20,
+                    max_queue=8,
+                ) as ws:
+                    # Offset refresh is timed from connect until an offset is set, then from that.
+                    offset_timer_start_ns = time.monotonic_ns()
                     payload = subscribe_payload(symbol)
                     sub_send_ms = epoch_ms()
-                    await ws.send(json.dumps(payload))
-                    print(f"[{utc_iso_now()}] subscribed payload={payload}")
+                    await ws.send(json_dumps(payload))
+                    log.info(f"subscribed payload={payload}")
                     reconnect_attempt = 0
 
                     while not stop_event.is_set():
-                        if (
-                            max_seconds is not None
-                            and (epoch_ms() - session_start_ms) / 1000.0 >= max_seconds
-                        ):
+                        # One monotonic read drives every timer in this iteration.
+                        now_ns = time.monotonic_ns()
+                        if max_run_ns is not None and now_ns - session_start_ns >= max_run_ns:
                             stop_event.set()
                             break
 
                         if (
-                            offset_refresh_seconds > 0.0
-                            and (
-                                (
-                                    clock_offset_ready
-                                    and clock_offset_set_ms is not None
-                                    and (epoch_ms() - clock_offset_set_ms) / 1000.0
-                                    >= offset_refresh_seconds
-                                )
-                                or (
-                                    not clock_offset_ready
-                                    and (epoch_ms() - connection_open_ms) / 1000.0
-                                    >= offset_refresh_seconds
-                                )
-                            )
+                            offset_refresh_ns > 0
+                            and now_ns - offset_timer_start_ns >= offset_refresh_ns
                         ):
-                            print(
-                                f"[{utc_iso_now()}] refreshing clock offset after "
+                            log.info(
+                                f"refreshing clock offset after "
                                 f"{offset_refresh_seconds:.0f}s via reconnect"
                             )
                             break
 
-                        raw = await asyncio.wait_for(ws.recv(), timeout=30)
-                        recv_ts_ms = epoch_ms()
-                        msg = json.loads(raw)
+                        # Raw bytes go straight to the decoders, skipping the str round trip.
+                        raw = await asyncio.wait_for(ws.recv(decode=False), timeout=30)
+                        capture_iso, recv_ts_ms = now_iso_and_ms()
+                        ticker = decode_ticker(raw)
+                        msg = json_loads(raw) if ticker is None else None
 
-                        if msg.get("method") == "subscribe":
+                        if msg is not None and msg.get("method") == "subscribe":
                             if not msg.get("success", False):
                                 raise RuntimeError(f"subscription failed: {msg}")
                             server_in_ms = parse_exchange_ts_ms(msg.get("time_in"))
@@ -266,45 +467,49 @@ async def run_collector(
                                 t3 = local_recv_ms
                                 # NTP style estimate: server_clock - local_clock.
                                 candidate_offset_ms = ((t1 - t0) + (t2 - t3)) / 2.0
-                                accepted, reason = validate_clock_offset(
-                                    candidate_offset_ms=candidate_offset_ms,
-                                    last_good_offset_ms=last_good_offset_ms,
+                                accepted, reason = offset_filter.update(
+                                    candidate_offset_ms,
                                     max_abs_clock_offset_ms=max_abs_clock_offset_ms,
                                     max_offset_jump_ms=max_offset_jump_ms,
                                 )
+                                last_good_offset_ms = offset_filter.mean
                                 if accepted is None:
                                     if last_good_offset_ms is not None:
                                         clock_offset_ms = last_good_offset_ms
                                         clock_offset_ready = True
-                                        clock_offset_set_ms = recv_ts_ms
-                                        print(
-                                            f"[{utc_iso_now()}] warning: clock_offset candidate="
+                                        offset_timer_start_ns = now_ns
+                                        log.warning(
+                                            f"warning: clock_offset candidate="
                                             f"{candidate_offset_ms:.3f} rejected ({reason}); "
                                             f"reusing last_good={last_good_offset_ms:.3f}"
                                         )
                                     else:
-                                        print(
-                                            f"[{utc_iso_now()}] warning: clock_offset candidate="
+                                        log.warning(
+                                            f"warning: clock_offset candidate="
                                             f"{candidate_offset_ms:.3f} rejected ({reason}); "
                                             "using raw_age_ms until a valid offset is available"
                                         )
                                 else:
                                     clock_offset_ms = accepted
                                     clock_offset_ready = True
-                                    clock_offset_set_ms = recv_ts_ms
-                                    last_good_offset_ms = accepted
-                                    print(
-                                        f"[{utc_iso_now()}] clock_offset_ms={clock_offset_ms:.3f} "
-                                        f"(server-local, {reason})"
+                                    offset_timer_start_ns = now_ns
+                                    log.info(
+                                        f"clock_offset_ms={clock_offset_ms:.3f} "
+                                        f"(server-local, {reason}, "
+                                        f"candidate={candidate_offset_ms:.3f})"
                                     )
                             continue
 
-                        ticker = parse_ticker_event(msg)
                         if ticker is None:
                             continue
 
-                        exchange_ts = ticker.get("timestamp")
-                        exchange_ts_ms = parse_exchange_ts_ms(exchange_ts)
+                        exchange_ts = ticker.timestamp
+                        if exchange_ts == last_ts:
+                            exchange_ts_ms = last_ts_ms
+                        else:
+                            exchange_ts_ms = parse_exchange_ts_ms(exchange_ts)
+                            last_ts = exchange_ts
+                            last_ts_ms = exchange_ts_ms
                         if exchange_ts_ms is None:
                             continue
 
@@ -312,44 +517,52 @@ async def run_collector(
                         adjusted_age_ms = (
                             raw_age_ms + clock_offset_ms if clock_offset_ready else raw_age_ms
                         )
-                        sample = LatencySample(
-                            exchange_ts_ms=exchange_ts_ms,
-                            recv_ts_ms=recv_ts_ms,
-                            raw_age_ms=raw_age_ms,
-                            adjusted_age_ms=adjusted_age_ms,
-                            e2e_since_sub_ms=recv_ts_ms - sub_send_ms,
-                        )
-                        stats.add(sample)
-
-                        writer.writerow(
-                            [
-                                utc_iso_now(),
-                                f"{recv_ts_ms:.3f}",
-                                exchange_ts,
-                                f"{exchange_ts_ms:.3f}",
-                                ticker.get("symbol", symbol),
-                                ticker.get("bid"),
-                                ticker.get("ask"),
-                                ticker.get("bid_qty"),
-                                ticker.get("ask_qty"),
-                                f"{raw_age_ms:.3f}",
-                                f"{adjusted_age_ms:.3f}",
-                                f"{sample.e2e_since_sub_ms:.3f}",
-                            ]
-                        )
+                        e2e_since_sub_ms = recv_ts_ms - sub_send_ms
+                        stats.add(adjusted_age_ms)
+
+                        row_symbol = ticker.symbol or symbol
+                        bid = ticker.bid
+                        ask = ticker.ask
+                        bid_qty = ticker.bid_qty
+                        ask_qty = ticker.ask_qty
+                        if "," not in row_symbol and '"' not in row_symbol:
+                            # Every cell is a plain token, so skip csv quoting (\r\n like csv).
+                            writer.write_line(
+                                f"{capture_iso},{recv_ts_ms:.3f},{exchange_ts},"
+                                f"{exchange_ts_ms:.3f},{row_symbol},{bid},{ask},{bid_qty},"
+                                f"{ask_qty},{raw_age_ms:.3f},{adjusted_age_ms:.3f},"
+                                f"{e2e_since_sub_ms:.3f}\r\n",
+                                recv_ts_ms,
+                            )
+                        else:
+                            writer.writerow(
+                                [
+                                    capture_iso,
+                                    f"{recv_ts_ms:.3f}",
+                                    exchange_ts,
+                                    f"{exchange_ts_ms:.3f}",
+                                    row_symbol,
+                                    bid,
+                                    ask,
+                                    bid_qty,
+                                    ask_qty,
+                                    f"{raw_age_ms:.3f}",
+                                    f"{adjusted_age_ms:.3f}",
+                                    f"{e2e_since_sub_ms:.3f}",
+                                ],
+                                recv_ts_ms,
+                            )
 
-                        if time.monotonic() >= next_summary_ts:
+                        if now_ns >= next_summary_ns:
                             s = stats.summary()
-                            print(
-                                (
-                                    f"[{utc_iso_now()}] n={int(s['count_window'])} "
-                                    f"rate={s['msg_rate_per_s']:.2f}/s "
-                                    f"age_ms p50={s['age_ms_p50']:.2f} "
-                                    f"p95={s['age_ms_p95']:.2f} p99={s['age_ms_p99']:.2f} "
-                                    f"mean={s['age_ms_mean']:.2f} max={s['age_ms_max']:.2f}"
-                                )
+                            log.info(
+                                f"n={int(s['count_window'])} "
+                                f"rate={s['msg_rate_per_s']:.2f}/s "
+                                f"age_ms p50={s['age_ms_p50']:.2f} "
+                                f"p95={s['age_ms_p95']:.2f} p99={s['age_ms_p99']:.2f} "
+                                f"mean={s['age_ms_mean']:.2f} max={s['age_ms_max']:.2f}"
                             )
-                            next_summary_ts = time.monotonic() + summary_every_s
+                            next_summary_ns = now_ns + summary_every_ns
             except RuntimeError:
                 raise
             except (
@@ -358,13 +571,15 @@ async def run_collector(
                 websockets.exceptions.ConnectionClosed,
                 websockets.exceptions.WebSocketException,
                 json.JSONDecodeError,
+                UnicodeDecodeError,
+                msgspec.DecodeError,
             ) as exc:
                 if stop_event.is_set():
                     break
                 reconnect_attempt += 1
                 delay_s = min(30.0, 2.0 ** min(reconnect_attempt, 5))
-                print(
-                    f"[{utc_iso_now()}] warning: ws loop error={exc!r}; "
+                log.warning(
+                    f"warning: ws loop error={exc!r}; "
                     f"reconnect_attempt={reconnect_attempt} sleep={delay_s:.1f}s"
                 )
                 try:
@@ -373,7 +588,29 @@ async def run_collector(
                     pass
                 continue
 
-    print(f"[{utc_iso_now()}] stopped cleanly")
+    log.info("stopped cleanly")
+
+
+class UtcIsoFormatter(logging.Formatter):
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        return datetime.fromtimestamp(record.created, UTC).isoformat()
+
+
+def start_log_listener() -> tuple[QueueListener, QueueHandler]:
+    """Route collector logs through a queue so stdout writes happen on a background thread.
+
+    The caller stops the listener and removes the returned handler from ``log`` when done.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(UtcIsoFormatter("[%(asctime)s] %(message)s"))
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    log.addHandler(queue_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener, queue_handler
 
 
 def parse_args(argv: list[str]) -> argparse.Namespace:
@@ -427,7 +664,7 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         "--max-offset-jump-ms",
         type=float,
         default=500.0,
-        help="Reject new clock offsets that jump this much vs last accepted (default: 500).",
+        help="Reject new clock offsets that jump this much vs the filtered offset (default: 500).",
     )
     return parser.parse_args(argv)
 
@@ -435,24 +672,32 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
 def main(argv: list[str]) -> int:
     args = parse_args(argv)
     out_csv = Path(args.out) if args.out else default_output_path()
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    listener, queue_handler = start_log_listener()
     try:
-        asyncio.run(
-            run_collector(
-                symbol=args.symbol,
-                out_csv=out_csv,
-                summary_every_s=args.summary_every,
-                ws_url=args.ws_url,
-                max_seconds=args.max_seconds,
-                offset_refresh_seconds=args.offset_refresh_seconds,
-                max_abs_clock_offset_ms=args.max_abs_clock_offset_ms,
-                max_offset_jump_ms=args.max_offset_jump_ms,
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(
+                run_collector(
+                    symbol=args.symbol,
+                    out_csv=out_csv,
+                    summary_every_s=args.summary_every,
+                    ws_url=args.ws_url,
+                    max_seconds=args.max_seconds,
+                    offset_refresh_seconds=args.offset_refresh_seconds,
+                    max_abs_clock_offset_ms=args.max_abs_clock_offset_ms,
+                    max_offset_jump_ms=args.max_offset_jump_ms,
+                )
             )
-        )
     except KeyboardInterrupt:
         pass
     except Exception as exc:
         print(f"fatal: {exc}", file=sys.stderr)
         return 1
+    finally:
+        # Drains queued log lines before exit; detaching keeps repeated in-process runs from
+        # stacking handlers on the module logger.
+        listener.stop()
+        log.removeHandler(queue_handler)
     return 0
 
 
@@ -4,108 +4,108 @@
 from __future__ import annotations
 
 import argparse
-import csv
-from dataclasses import dataclass
+import sys
 from pathlib import Path
+from typing import NamedTuple
 
+import numpy as np
+import pandas as pd
 
-def pct(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    ordered = sorted(values)
-    if len(ordered) == 1:
-        return ordered[0]
-    idx = (len(ordered) - 1) * p
-    lo = int(idx)
-    hi = min(lo + 1, len(ordered) - 1)
-    frac = idx - lo
-    return ordered[lo] * (1.0 - frac) + ordered[hi] * frac
+REQUIRED_COLUMNS = ["exchange_ts_ms", "bid", "ask", "bid_qty", "ask_qty", "adjusted_age_ms"]
 
 
-def parse_float(row: list[str], idx: int) -> float | None:
-    try:
-        return float(row[idx])
-    except (ValueError, IndexError):
-        return None
+def pcts(values: np.ndarray, ps: list[float]) -> np.ndarray:
+    n = values.size
+    if n == 0:
+        return np.zeros(len(ps))
+    pos = (n - 1) * np.asarray(ps, dtype=np.float64)
+    lo = pos.astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    # Select only the order statistics we interpolate between, all in one partition.
+    part = np.partition(values, np.unique(np.concatenate((lo, hi))))
+    frac = pos - lo
+    return part[lo] * (1.0 - frac) + part[hi] * frac
+
+
+def top_k_desc(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, descending, ties in file order."""
+    k = min(max(k, 0), values.size)
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    # Partial partition finds the k-th largest; only rows at or above it get sorted.
+    threshold = np.partition(values, values.size - k)[values.size - k]
+    candidates = np.flatnonzero(values >= threshold)
+    return candidates[np.argsort(-values[candidates], kind="stable")[:k]]
 
 
-@dataclass
-class Row:
-    capture_time_utc: str
-    exchange_ts_ms: float
-    bid: float
-    ask: float
-    bid_qty: float
-    ask_qty: float
-    adjusted_age_ms: float
-    e2e_since_sub_ms: float | None
+class Rows(NamedTuple):
+    """Parallel per-row columns; e2e_since_sub_ms is NaN where unknown."""
 
-    @property
-    def spread(self) -> float:
-        return self.ask - self.bid
+    capture_time_utc: np.ndarray
+    exchange_ts_ms: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_qty: np.ndarray
+    ask_qty: np.ndarray
+    adjusted_age_ms: np.ndarray
+    e2e_since_sub_ms: np.ndarray
 
+    def tail(self, start: int) -> Rows:
+        return Rows(*(col[start:] for col in self))
 
-def parse_row(header: list[str], row: list[str]) -> Row | None:
-    if not row:
-        return None
 
+def read_header(path: Path) -> list[str]:
     try:
-        idx_exchange_ts_ms = header.index("exchange_ts_ms")
-        idx_bid = header.index("bid")
-        idx_ask = header.index("ask")
-        idx_bid_qty = header.index("bid_qty")
-        idx_ask_qty = header.index("ask_qty")
-        idx_adjusted = header.index("adjusted_age_ms")
-    except ValueError:
-        return None
-
-    capture_time = row[0]
-    exchange_ts_ms = parse_float(row, idx_exchange_ts_ms)
-    bid = parse_float(row, idx_bid)
-    ask = parse_float(row, idx_ask)
-    bid_qty = parse_float(row, idx_bid_qty)
-    ask_qty = parse_float(row, idx_ask_qty)
-    adjusted_age_ms = parse_float(row, idx_adjusted)
-
-    if None in (exchange_ts_ms, bid, ask, bid_qty, ask_qty, adjusted_age_ms):
-        return None
-
-    e2e = None
-    if "e2e_since_sub_ms" in header:
-        e2e = parse_float(row, header.index("e2e_since_sub_ms"))
-
-    return Row(
-        capture_time_utc=capture_time,
-        exchange_ts_ms=exchange_ts_ms,  # type: ignore[arg-type]
-        bid=bid,  # type: ignore[arg-type]
-        ask=ask,  # type: ignore[arg-type]
-        bid_qty=bid_qty,  # type: ignore[arg-type]
-        ask_qty=ask_qty,  # type: ignore[arg-type]
-        adjusted_age_ms=adjusted_age_ms,  # type: ignore[arg-type]
-        e2e_since_sub_ms=e2e,
+        return [str(c) for c in pd.read_csv(path, nrows=0).columns]
+    except pd.errors.EmptyDataError:
+        return []
+
+
+def load_rows(path: Path, header: list[str]) -> Rows:
+    """Parse the file column-wise, dropping rows with any unparseable required field."""
+    has_e2e = "e2e_since_sub_ms" in header
+    usecols = list(dict.fromkeys([header[0], *REQUIRED_COLUMNS]))
+    if has_e2e:
+        usecols.append("e2e_since_sub_ms")
+    df = pd.read_csv(
+        path,
+        usecols=usecols,
+        dtype={header[0]: "string"},
+        # An over-wide first row (torn line glued to the next) must not become an implicit
+        # index that shifts every column left.
+        index_col=False,
+        engine="c",
+        low_memory=False,
+        on_bad_lines="skip",
+    )
+    cols = {
+        name: pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+        for name in REQUIRED_COLUMNS
+    }
+    keep = ~np.logical_or.reduce([np.isnan(col) for col in cols.values()])
+    if has_e2e:
+        e2e = pd.to_numeric(df["e2e_since_sub_ms"], errors="coerce").to_numpy(dtype=np.float64)
+    else:
+        e2e = np.full(keep.size, np.nan)
+    capture = df[header[0]].fillna("").to_numpy(dtype=object)
+    return Rows(
+        capture[keep],
+        *(cols[name][keep] for name in REQUIRED_COLUMNS),
+        e2e[keep],
     )
 
 
-def split_runs(rows: list[Row]) -> list[list[Row]]:
-    if not rows:
-        return []
-    runs: list[list[Row]] = []
-    current: list[Row] = []
-    prev_e2e: float | None = None
-    for row in rows:
-        e2e = row.e2e_since_sub_ms
-        if current and e2e is not None and prev_e2e is not None and e2e + 1e-6 < prev_e2e:
-            runs.append(current)
-            current = []
-        current.append(row)
-        if e2e is not None:
-            prev_e2e = e2e
-    if current:
-        runs.append(current)
-    return runs
-
-
-def main() -> int:
+def split_runs(e2e: np.ndarray) -> np.ndarray:
+    """Return the start index of each run; the latest run is ``[starts[-1]:]``."""
+    if e2e.size == 0:
+        return np.empty(0, dtype=np.intp)
+    # Only rows with a known e2e take part in the comparison, so gaps never split a run.
+    idx = np.flatnonzero(np.isfinite(e2e))
+    breaks = idx[np.flatnonzero(np.diff(e2e[idx]) < -1e-6) + 1]
+    return np.concatenate(([0], breaks))
+
+
+def main(argv: list[str]) -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--file", required=True, help="Input CSV path from collector.")
     parser.add_argument(
@@ -145,52 +145,47 @@ def main() -> int:
         default=5000.0,
         help="Fail threshold for largest backward timestamp jump magnitude in ms.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     path = Path(args.file)
     if not path.exists():
         print(f"file not found: {path}")
         return 1
 
-    with path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        if not header:
-            print("empty file")
-            return 1
-        parsed = [r for row in reader if (r := parse_row(header, row)) is not None]
-
-    if not parsed:
+    header = read_header(path)
+    if not header:
+        print("empty file")
+        return 1
+    if not set(REQUIRED_COLUMNS).issubset(header):
+        print("no parseable rows with expected schema")
+        return 1
+    parsed = load_rows(path, header)
+    if parsed.bid.size == 0:
         print("no parseable rows with expected schema")
         return 1
 
-    runs = split_runs(parsed)
-    rows = parsed if args.all_runs else runs[-1]
-    n = len(rows)
-    start = rows[0].capture_time_utc
-    end = rows[-1].capture_time_utc
-
-    spreads = [r.spread for r in rows]
-    ages = [r.adjusted_age_ms for r in rows]
-
-    crossed_quotes = sum(1 for r in rows if r.bid > r.ask)
-    non_positive_sizes = sum(1 for r in rows if r.bid_qty <= 0.0 or r.ask_qty <= 0.0)
-    non_positive_spread = sum(1 for s in spreads if s <= 0.0)
-
-    backward_ts_count = 0
-    max_backward_jump_ms = 0.0
-    prev_ts = rows[0].exchange_ts_ms
-    for r in rows[1:]:
-        delta = r.exchange_ts_ms - prev_ts
-        if delta < -abs(args.max_timestamp_backward_ms):
-            backward_ts_count += 1
-            max_backward_jump_ms = min(max_backward_jump_ms, delta)
-        prev_ts = r.exchange_ts_ms
-
-    duration_s = max((rows[-1].exchange_ts_ms - rows[0].exchange_ts_ms) / 1000.0, 1e-9)
+    runs = split_runs(parsed.e2e_since_sub_ms)
+    rows = parsed if args.all_runs else parsed.tail(int(runs[-1]))
+    n = rows.bid.size
+    start = rows.capture_time_utc[0]
+    end = rows.capture_time_utc[-1]
+
+    spreads = rows.ask - rows.bid
+    ages = rows.adjusted_age_ms
+
+    crossed_quotes = int(np.count_nonzero(rows.bid > rows.ask))
+    non_positive_sizes = int(np.count_nonzero((rows.bid_qty <= 0.0) | (rows.ask_qty <= 0.0)))
+    non_positive_spread = int(np.count_nonzero(spreads <= 0.0))
+
+    ts_delta = np.diff(rows.exchange_ts_ms)
+    backward = ts_delta[ts_delta < -abs(args.max_timestamp_backward_ms)]
+    backward_ts_count = int(backward.size)
+    max_backward_jump_ms = float(backward.min()) if backward.size else 0.0
+
+    duration_s = max((rows.exchange_ts_ms[-1] - rows.exchange_ts_ms[0]) / 1000.0, 1e-9)
     update_rate = n / duration_s
 
-    spikes = sorted(rows, key=lambda r: r.adjusted_age_ms, reverse=True)[: max(args.top_spikes, 0)]
+    spike_idx = top_k_desc(ages, args.top_spikes)
 
     print(f"runs_detected={len(runs)} mode={'all_runs' if args.all_runs else 'latest_run'}")
     print(f"start={start}")
@@ -198,14 +193,16 @@ def main() -> int:
     print(f"samples={n}")
     print(f"duration_s={duration_s:.3f}")
     print(f"update_rate_per_s={update_rate:.3f}")
-    print(f"spread min={min(spreads):.8f}")
-    print(f"spread p50={pct(spreads, 0.50):.8f}")
-    print(f"spread p95={pct(spreads, 0.95):.8f}")
-    print(f"spread max={max(spreads):.8f}")
-    print(f"age_ms p50={pct(ages, 0.50):.3f}")
-    print(f"age_ms p95={pct(ages, 0.95):.3f}")
-    print(f"age_ms p99={pct(ages, 0.99):.3f}")
-    print(f"age_ms max={max(ages):.3f}")
+    spread_min, spread_p50, spread_p95, spread_max = pcts(spreads, [0.0, 0.50, 0.95, 1.0])
+    age_p50, age_p95, age_p99, age_max = pcts(ages, [0.50, 0.95, 0.99, 1.0])
+    print(f"spread min={spread_min:.8f}")
+    print(f"spread p50={spread_p50:.8f}")
+    print(f"spread p95={spread_p95:.8f}")
+    print(f"spread max={spread_max:.8f}")
+    print(f"age_ms p50={age_p50:.3f}")
+    print(f"age_ms p95={age_p95:.3f}")
+    print(f"age_ms p99={age_p99:.3f}")
+    print(f"age_ms max={age_max:.3f}")
     print(f"integrity crossed_quotes={crossed_quotes}")
     print(f"integrity non_positive_sizes={non_positive_sizes}")
     print(f"integrity non_positive_spread={non_positive_spread}")
@@ -214,10 +211,10 @@ def main() -> int:
     backward_share = backward_ts_count / n
     print(f"integrity backward_exchange_ts_share={backward_share:.2%}")
 
-    if spikes:
+    if spike_idx.size:
         print("top_latency_spikes:")
-        for spike in spikes:
-            print(f"{spike.capture_time_utc} adjusted_age_ms={spike.adjusted_age_ms:.3f}")
+        for i in spike_idx:
+            print(f"{rows.capture_time_utc[i]} adjusted_age_ms={ages[i]:.3f}")
 
     backward_severe = (
         backward_share > args.max_backward_share
@@ -240,4 +237,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
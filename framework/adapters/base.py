@@ -14,5 +14,7 @@ class ExchangeAdapter(Protocol):
     def subscribe_payload(self, symbol: str) -> dict[str, Any]:
         """Build subscription payload for BBO stream."""
 
-    def parse_bbo(self, message: dict[str, Any], capture_ts_ms: float) -> BBOEvent | None:
+    def parse_bbo(
+        self, message: dict[str, Any] | bytes | str, capture_ts_ms: float
+    ) -> BBOEvent | None:
         """Parse raw exchange message into canonical BBO event."""
@@ -1,11 +1,33 @@
 from __future__ import annotations
 
+import calendar
 from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Literal
+
+import msgspec
 
 from mm_core.framework.models import BBOEvent
 
 
+class _TickerRow(msgspec.Struct):
+    bid: float
+    ask: float
+    bid_qty: float
+    ask_qty: float
+    timestamp: str
+    symbol: str = ""
+
+
+class _TickerFrame(msgspec.Struct):
+    channel: Literal["ticker"]
+    type: Literal["snapshot", "update"]
+    data: list[_TickerRow]
+
+
+_ticker_decoder = msgspec.json.Decoder(_TickerFrame, strict=False)
+
+
 class KrakenBBOAdapter:
     exchange_name = "kraken"
 
@@ -23,40 +45,59 @@ class KrakenBBOAdapter:
             },
         }
 
-    def parse_bbo(self, message: dict[str, Any], capture_ts_ms: float) -> BBOEvent | None:
-        if message.get("channel") != "ticker":
-            return None
-        if message.get("type") not in {"snapshot", "update"}:
-            return None
-        data = message.get("data")
-        if not isinstance(data, list) or not data:
+    def parse_bbo(
+        self, message: dict[str, Any] | bytes | str, capture_ts_ms: float
+    ) -> BBOEvent | None:
+        # Raw frames decode straight into structs; already-decoded dicts are validated the same
+        # way (lax mode keeps accepting numeric strings, as float() did).
+        try:
+            if isinstance(message, (bytes, str)):
+                frame = _ticker_decoder.decode(message)
+            else:
+                frame = msgspec.convert(message, _TickerFrame, strict=False)
+        except (msgspec.ValidationError, msgspec.DecodeError):
             return None
-        row = data[0]
-        if not isinstance(row, dict):
+        if not frame.data:
             return None
+        row = frame.data[0]
 
-        exchange_ts_ms = parse_exchange_ts_ms(row.get("timestamp"))
+        exchange_ts_ms = parse_exchange_ts_ms(row.timestamp)
         if exchange_ts_ms is None:
             return None
 
-        try:
-            return BBOEvent(
-                exchange=self.exchange_name,
-                symbol=str(row.get("symbol", "")).upper(),
-                exchange_ts_ms=exchange_ts_ms,
-                capture_ts_ms=capture_ts_ms,
-                bid=float(row["bid"]),
-                ask=float(row["ask"]),
-                bid_qty=float(row["bid_qty"]),
-                ask_qty=float(row["ask_qty"]),
-            )
-        except (KeyError, TypeError, ValueError):
-            return None
+        return BBOEvent(
+            self.exchange_name,
+            row.symbol.upper(),
+            exchange_ts_ms,
+            capture_ts_ms,
+            row.bid,
+            row.ask,
+            row.bid_qty,
+            row.ask_qty,
+        )
+
+
+@lru_cache(maxsize=8)
+def _utc_midnight_s(year: int, month: int, day: int) -> int:
+    return calendar.timegm((year, month, day, 0, 0, 0))
+
+
+def parse_kraken_ts(value: str) -> float:
+    """Parse Kraken's fixed ``YYYY-MM-DDTHH:MM:SS.ffffffZ`` shape into epoch ms."""
+    if len(value) != 27 or value[26] != "Z" or value[10] != "T" or value[19] != ".":
+        raise ValueError(f"unexpected timestamp shape: {value!r}")
+    day_s = _utc_midnight_s(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    secs = day_s + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+    return secs * 1000.0 + int(value[20:26]) / 1000.0
 
 
 def parse_exchange_ts_ms(value: str | None) -> float | None:
     if not value:
         return None
+    try:
+        return parse_kraken_ts(value)
+    except ValueError:
+        pass
     normalized = value.replace("Z", "+00:00")
     try:
         return datetime.fromisoformat(normalized).timestamp() * 1000.0
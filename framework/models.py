@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import msgspec
 
 
-@dataclass(frozen=True)
-class BBOEvent:
+class BBOEvent(msgspec.Struct, frozen=True, gc=False):
+    # gc=False: events hold only scalars and strings, so they can never form reference cycles.
     exchange: str
     symbol: str
     exchange_ts_ms: float
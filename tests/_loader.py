@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+from types import ModuleType
+
+
+def load_module(module_name: str, relative_path: str) -> ModuleType:
+    """Import a top-level script once per test process; later calls reuse ``sys.modules``."""
+    cached = sys.modules.get(module_name)
+    if cached is not None:
+        return cached
+    root = Path(__file__).resolve().parents[1]
+    module_path = root / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed loading module from {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
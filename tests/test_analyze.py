@@ -1,27 +1,19 @@
 from __future__ import annotations
 
-import importlib.util
+import math
 from pathlib import Path
-import sys
+import tempfile
 import unittest
 
+import numpy as np
 
-def _load_module(module_name: str, relative_path: str):
-    root = Path(__file__).resolve().parents[1]
-    module_path = root / relative_path
-    spec = importlib.util.spec_from_file_location(module_name, module_path)
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"failed loading module from {module_path}")
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[module_name] = module
-    spec.loader.exec_module(module)
-    return module
+from _loader import load_module
 
 
 class AnalyzeTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.analyze = _load_module("mm_core_analyze", "analyze.py")
+        cls.analyze = load_module("mm_core_analyze", "analyze.py")
 
     def test_parse_row_legacy_does_not_infer_e2e(self) -> None:
         header = [
@@ -50,23 +42,105 @@ class AnalyzeTests(unittest.TestCase):
             "a",
             "b",
         ]
-        parsed = self.analyze.parse_row(header, row, prefer_adjusted=False)
+        parsed = self.analyze.parse_row(
+            adj_idx=self.analyze.column_index(header, "adjusted_age_ms"),
+            legacy_idx=self.analyze.column_index(header, "data_age_ms"),
+            e2e_idx=self.analyze.column_index(header, "e2e_since_sub_ms"),
+            row=row,
+            prefer_adjusted=False,
+        )
         self.assertIsNotNone(parsed)
-        self.assertEqual(parsed.age_ms, 15.5)
-        self.assertIsNone(parsed.e2e_since_sub_ms)
+        _, age, e2e = parsed
+        self.assertEqual(age, 15.5)
+        self.assertTrue(math.isnan(e2e))
 
     def test_split_runs_on_e2e_reset(self) -> None:
-        parsed_rows = [
-            self.analyze.ParsedRow("t1", 1.0, 1000.0),
-            self.analyze.ParsedRow("t2", 2.0, 1200.0),
-            self.analyze.ParsedRow("t3", 3.0, 200.0),
-            self.analyze.ParsedRow("t4", 4.0, 300.0),
-        ]
-        runs = self.analyze.split_runs(parsed_rows)
-        self.assertEqual(len(runs), 2)
-        self.assertEqual(len(runs[0]), 2)
-        self.assertEqual(len(runs[1]), 2)
+        e2e = np.array([1000.0, 1200.0, 200.0, 300.0])
+        starts = self.analyze.split_runs(e2e)
+        self.assertEqual(starts.tolist(), [0, 2])
+
+    def test_split_runs_ignores_missing_e2e(self) -> None:
+        e2e = np.array([1000.0, np.nan, 900.0, np.nan, 950.0])
+        starts = self.analyze.split_runs(e2e)
+        self.assertEqual(starts.tolist(), [0, 2])
+
+    def test_pcts_interpolates_between_order_statistics(self) -> None:
+        values = np.array([9.0, 1.0, 5.0, 3.0, 7.0])
+        result = self.analyze.pcts(values, [0.0, 0.5, 0.95, 1.0])
+        self.assertEqual(result.tolist(), [1.0, 5.0, 8.6, 9.0])
+        self.assertEqual(values.tolist(), [9.0, 1.0, 5.0, 3.0, 7.0])
+
+    def test_count_regimes_uses_inclusive_upper_bounds(self) -> None:
+        ages = np.array([5.0, 10.0, 10.5, 20.0, 20.5])
+        counts = self.analyze.count_regimes(ages, normal_max=10.0, degraded_max=20.0)
+        self.assertEqual(counts, {"normal": 2, "degraded": 2, "unsafe": 1})
+
+    def test_load_samples_does_not_shift_columns_on_an_over_wide_first_row(self) -> None:
+        header = ["capture_time_utc", "symbol", "adjusted_age_ms", "e2e_since_sub_ms"]
+        rows = ["t0,BTC/EUR,5.0,100.0,glued", "t1,BTC/EUR,8.0,1.0", "t2,BTC/EUR,9.0,2.0"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latency.csv"
+            path.write_text("\n".join([",".join(header), *rows]) + "\n", "utf-8")
+            samples = self.analyze.load_samples(path, header)
+        self.assertEqual(samples.capture_time_utc.tolist(), ["t0", "t1", "t2"])
+        self.assertEqual(samples.age_ms.tolist(), [5.0, 8.0, 9.0])
+        self.assertEqual(self.analyze.split_runs(samples.e2e_since_sub_ms).tolist(), [0, 1])
+
+    def test_load_latest_run_reads_only_the_tail(self) -> None:
+        header = ["capture_time_utc", "adjusted_age_ms", "e2e_since_sub_ms"]
+        lines = [",".join(header)]
+        lines += [f"old{i},1.0,{100.0 + i}" for i in range(200)]
+        lines += [f"new{i},2.0,{1.0 + i}" for i in range(5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latency.csv"
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            samples, starts, exact = self.analyze.load_latest_run(path, header, chunk_bytes=64)
+        latest = samples.tail(int(starts[-1]))
+        self.assertFalse(exact)
+        self.assertEqual(latest.capture_time_utc.tolist(), [f"new{i}" for i in range(5)])
+        self.assertLess(samples.age_ms.size, 200)
+
+    def test_load_latest_run_tolerates_a_torn_last_line(self) -> None:
+        header = ["capture_time_utc", "adjusted_age_ms", "e2e_since_sub_ms"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latency.csv"
+            path.write_text(",".join(header) + "\nnew0,2.0,1.0\nnew1,2.0,2.0\nnew2,2", "utf-8")
+            samples, starts, exact = self.analyze.load_latest_run(path, header, chunk_bytes=16)
+            self.assertTrue(exact)
+            self.assertEqual(samples.capture_time_utc.tolist(), ["new0", "new1", "new2"])
+            self.assertEqual(starts.tolist(), [0])
+
+            path.write_text(",".join(header) + "\nnew0,2", "utf-8")
+            samples, starts, _ = self.analyze.load_latest_run(path, header, chunk_bytes=16)
+            self.assertEqual(samples.age_ms.size, 0)
+
+    def test_load_latest_run_handles_an_over_wide_first_row_in_the_window(self) -> None:
+        header = ["capture_time_utc", "symbol", "adjusted_age_ms", "e2e_since_sub_ms"]
+        rows = ["old0,BTC/EUR,1.0,9.0", "t0,BTC/EUR,5.0,100.0,glued,x", "t1,BTC/EUR,8.0,1.0"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latency.csv"
+            path.write_text("\n".join([",".join(header), *rows]) + "\n", "utf-8")
+            tail_bytes = len("\n".join(rows[1:])) + 1
+            samples, starts, exact = self.analyze.load_latest_run(
+                path, header, chunk_bytes=tail_bytes
+            )
+        self.assertFalse(exact)
+        self.assertEqual(samples.capture_time_utc.tolist(), ["t0", "t1"])
+        self.assertEqual(samples.age_ms.tolist(), [5.0, 8.0])
+        self.assertEqual(starts.tolist(), [0, 1])
 
+    def test_load_latest_run_keeps_a_line_the_seek_lands_on(self) -> None:
+        header = ["capture_time_utc", "adjusted_age_ms", "e2e_since_sub_ms"]
+        tail = "old1,1.0,10.0\nnew0,2.0,1.0\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latency.csv"
+            path.write_text(",".join(header) + "\nold0,1.0,9.0\n" + tail, "utf-8")
+            samples, starts, exact = self.analyze.load_latest_run(
+                path, header, chunk_bytes=len(tail)
+            )
+        self.assertFalse(exact)
+        self.assertEqual(samples.capture_time_utc.tolist(), ["old1", "new0"])
+        self.assertEqual(starts.tolist(), [0, 1])
 
 if __name__ == "__main__":
     unittest.main()
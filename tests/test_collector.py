@@ -1,41 +1,88 @@
 from __future__ import annotations
 
-import importlib.util
-from pathlib import Path
-import sys
+import io
 import unittest
 
-
-def _load_module(module_name: str, relative_path: str):
-    root = Path(__file__).resolve().parents[1]
-    module_path = root / relative_path
-    spec = importlib.util.spec_from_file_location(module_name, module_path)
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"failed loading module from {module_path}")
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[module_name] = module
-    spec.loader.exec_module(module)
-    return module
+from _loader import load_module
 
 
 class CollectorTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        cls.collector = _load_module("mm_core_collector", "collector.py")
-
-    def test_parse_ticker_event_accepts_snapshot(self) -> None:
-        msg = {
-            "channel": "ticker",
-            "type": "snapshot",
-            "data": [{"symbol": "BTC/EUR", "bid": "1", "ask": "2"}],
-        }
-        row = self.collector.parse_ticker_event(msg)
+        cls.collector = load_module("mm_core_collector", "collector.py")
+
+    def test_decode_ticker_accepts_snapshot(self) -> None:
+        raw = (
+            '{"channel":"ticker","type":"snapshot","data":[{"symbol":"BTC/EUR","bid":1.5,'
+            '"bid_qty":0.1,"ask":2,"ask_qty":0.2,"last":1.7,'
+            '"timestamp":"2026-02-22T15:26:40.186022Z"}]}'
+        )
+        row = self.collector.decode_ticker(raw)
         self.assertIsNotNone(row)
-        self.assertEqual(row["symbol"], "BTC/EUR")
+        self.assertEqual(row.symbol, "BTC/EUR")
+        self.assertEqual(row.ask, 2.0)
 
-    def test_parse_ticker_event_rejects_non_ticker(self) -> None:
-        msg = {"channel": "trade", "type": "snapshot", "data": [{}]}
-        self.assertIsNone(self.collector.parse_ticker_event(msg))
+    def test_decode_ticker_accepts_row_without_symbol(self) -> None:
+        raw = (
+            '{"channel":"ticker","type":"update","data":[{"bid":1.5,"bid_qty":0.1,"ask":2,'
+            '"ask_qty":0.2,"timestamp":"2026-02-22T15:26:40.186022Z"}]}'
+        )
+        row = self.collector.decode_ticker(raw)
+        self.assertIsNotNone(row)
+        self.assertEqual(row.symbol, "")
+        self.assertEqual(row.bid, 1.5)
+
+    def test_decode_ticker_rejects_non_ticker(self) -> None:
+        self.assertIsNone(
+            self.collector.decode_ticker('{"channel":"trade","type":"snapshot","data":[{}]}')
+        )
+        self.assertIsNone(
+            self.collector.decode_ticker('{"method":"subscribe","success":true,"time_in":"x"}')
+        )
+        self.assertIsNone(
+            self.collector.decode_ticker('{"channel":"ticker","type":"ack","data":[]}')
+        )
+
+    def test_parse_exchange_ts_ms_fast_path_matches_isoformat(self) -> None:
+        self.assertAlmostEqual(
+            self.collector.parse_exchange_ts_ms("2026-02-22T15:26:40.186022Z"),
+            1771774000186.022,
+            places=3,
+        )
+
+    def test_parse_exchange_ts_ms_falls_back_for_other_shapes(self) -> None:
+        self.assertAlmostEqual(
+            self.collector.parse_exchange_ts_ms("2026-02-22T15:26:40+00:00"),
+            1771774000000.0,
+            places=3,
+        )
+        self.assertIsNone(self.collector.parse_exchange_ts_ms("not-a-timestamp"))
+
+    def test_fast_iso_matches_datetime_isoformat(self) -> None:
+        expected = self.collector.datetime.fromtimestamp(
+            1771773998.778586, tz=self.collector.UTC
+        ).isoformat()
+        self.assertEqual(self.collector._fast_iso(1771773998, 778586), expected)
+
+    def test_rolling_stats_keeps_latest_window(self) -> None:
+        stats = self.collector.RollingStats(maxlen=3)
+        for age in [100.0, 1.0, 2.0, 3.0, 4.0]:
+            stats.add(age)
+        summary = stats.summary()
+        self.assertEqual(summary["count_window"], 3.0)
+        self.assertEqual(summary["age_ms_min"], 2.0)
+        self.assertAlmostEqual(summary["age_ms_mean"], 3.0)
+        self.assertEqual(summary["age_ms_p50"], 3.0)
+        self.assertEqual(summary["age_ms_max"], 4.0)
+
+    def test_batched_csv_writer_writes_all_lines_in_order_on_close(self) -> None:
+        out = io.BytesIO()
+        writer = self.collector.BatchedCsvWriter(out, max_rows=2, max_age_ms=1e12)
+        writer.write_line("a,1\r\n", 0.0)
+        writer.write_line("b,2\r\n", 0.0)
+        writer.writerow(["c,x", 3], 0.0)
+        writer.close()
+        self.assertEqual(out.getvalue(), b'a,1\r\nb,2\r\n"c,x",3\r\n')
 
     def test_validate_clock_offset_rejects_abs_outlier(self) -> None:
         accepted, reason = self.collector.validate_clock_offset(
@@ -67,6 +114,14 @@ class CollectorTests(unittest.TestCase):
         self.assertEqual(accepted, 120.0)
         self.assertEqual(reason, "accepted")
 
+    def test_clock_offset_filter_smooths_and_gates_outliers(self) -> None:
+        offsets = self.collector.ClockOffsetFilter(alpha=0.5, k_sigma=3.0, min_samples=2)
+        self.assertEqual(offsets.update(100.0, 2000.0, 500.0), (100.0, "accepted"))
+        self.assertEqual(offsets.update(104.0, 2000.0, 500.0), (102.0, "accepted"))
+        self.assertEqual(offsets.update(400.0, 2000.0, 500.0), (None, "rejected_sigma"))
+        self.assertEqual(offsets.mean, 102.0)
+        self.assertEqual(offsets.update(5000.0, 2000.0, 500.0), (None, "rejected_abs"))
+
 
 if __name__ == "__main__":
     unittest.main()
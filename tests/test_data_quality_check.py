@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+from contextlib import redirect_stdout
 import csv
+import io
 from pathlib import Path
-import subprocess
-import sys
 import tempfile
+from types import ModuleType
+from typing import NamedTuple
 import unittest
 
+import numpy as np
+
+from _loader import load_module
+
 
 CSV_HEADER = [
     "capture_time_utc",
@@ -24,23 +30,38 @@ CSV_HEADER = [
 ]
 
 
-def _run_qa(csv_path: Path) -> subprocess.CompletedProcess[str]:
-    script = Path(__file__).resolve().parents[1] / "data_quality_check.py"
-    return subprocess.run(
-        [sys.executable, str(script), "--file", str(csv_path), "--strict"],
-        check=False,
-        text=True,
-        capture_output=True,
-    )
+class QaResult(NamedTuple):
+    returncode: int
+    stdout: str
+
+
+def _run_qa(qa: ModuleType, csv_path: Path) -> QaResult:
+    # In-process run: no interpreter start-up per test.
+    out = io.StringIO()
+    with redirect_stdout(out):
+        returncode = qa.main(["--file", str(csv_path), "--strict"])
+    return QaResult(returncode, out.getvalue())
+
+
+def _write_fixture(path: Path, rows: list[list[str]], tail: str = "") -> Path:
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+        f.write(tail)
+    return path
 
 
 class DataQualityCheckTests(unittest.TestCase):
-    def test_strict_pass_clean_fixture(self) -> None:
-        with tempfile.NamedTemporaryFile("w", delete=False, newline="", suffix=".csv") as tmp:
-            path = Path(tmp.name)
-            writer = csv.writer(tmp)
-            writer.writerow(CSV_HEADER)
-            writer.writerow(
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.qa = load_module("mm_core_data_quality_check", "data_quality_check.py")
+        # Fixtures are static, so write them once per class into one temp directory.
+        cls._tmpdir = tempfile.TemporaryDirectory()
+        root = Path(cls._tmpdir.name)
+        cls.clean_path = _write_fixture(
+            root / "clean.csv",
+            [
                 [
                     "2026-02-23T00:00:00+00:00",
                     "1000",
@@ -54,9 +75,7 @@ class DataQualityCheckTests(unittest.TestCase):
                     "5",
                     "5",
                     "1",
-                ]
-            )
-            writer.writerow(
+                ],
                 [
                     "2026-02-23T00:00:01+00:00",
                     "2000",
@@ -70,21 +89,12 @@ class DataQualityCheckTests(unittest.TestCase):
                     "6",
                     "6",
                     "2",
-                ]
-            )
-        try:
-            result = _run_qa(path)
-            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
-            self.assertIn("qa_status=PASS", result.stdout)
-        finally:
-            path.unlink(missing_ok=True)
-
-    def test_strict_fail_backward_jump(self) -> None:
-        with tempfile.NamedTemporaryFile("w", delete=False, newline="", suffix=".csv") as tmp:
-            path = Path(tmp.name)
-            writer = csv.writer(tmp)
-            writer.writerow(CSV_HEADER)
-            writer.writerow(
+                ],
+            ],
+        )
+        cls.backward_jump_path = _write_fixture(
+            root / "backward_jump.csv",
+            [
                 [
                     "2026-02-23T00:00:00+00:00",
                     "1000",
@@ -98,9 +108,7 @@ class DataQualityCheckTests(unittest.TestCase):
                     "5",
                     "5",
                     "1",
-                ]
-            )
-            writer.writerow(
+                ],
                 [
                     "2026-02-23T00:00:01+00:00",
                     "2000",
@@ -114,14 +122,125 @@ class DataQualityCheckTests(unittest.TestCase):
                     "6",
                     "6",
                     "2",
-                ]
-            )
-        try:
-            result = _run_qa(path)
-            self.assertEqual(result.returncode, 2, result.stdout + result.stderr)
-            self.assertIn("qa_status=FAIL", result.stdout)
-        finally:
-            path.unlink(missing_ok=True)
+                ],
+            ],
+        )
+        cls.unparseable_path = _write_fixture(
+            root / "unparseable.csv",
+            [
+                [
+                    "2026-02-23T00:00:00+00:00",
+                    "1000",
+                    "2026-02-23T00:00:00+00:00",
+                    "1000",
+                    "BTC/EUR",
+                    "100",
+                    "101",
+                    "1.0",
+                    "1.0",
+                    "5",
+                    "5",
+                    "1",
+                ],
+                [
+                    "2026-02-23T00:00:01+00:00",
+                    "2000",
+                    "2026-02-23T00:00:01+00:00",
+                    "2000",
+                    "BTC/EUR",
+                    "bad",
+                    "101.1",
+                    "1.0",
+                    "1.0",
+                    "6",
+                    "6",
+                    "2",
+                ],
+            ],
+            # Partially written final line, as left by an interrupted collector.
+            tail="2026-02-23T00:00:02+00:00,3000,2026-02",
+        )
+        cls.over_wide_first_row_path = _write_fixture(
+            root / "over_wide_first_row.csv",
+            [
+                [
+                    "2026-02-23T00:00:00+00:00",
+                    "1000",
+                    "2026-02-23T00:00:00+00:00",
+                    "1000",
+                    "BTC/EUR",
+                    "100",
+                    "101",
+                    "1.0",
+                    "1.0",
+                    "5",
+                    "5",
+                    "1",
+                    # One field too many, as when a torn line is glued to the next row.
+                    "1771804800",
+                ],
+                [
+                    "2026-02-23T00:00:01+00:00",
+                    "2000",
+                    "2026-02-23T00:00:01+00:00",
+                    "2000",
+                    "BTC/EUR",
+                    "100.1",
+                    "101.1",
+                    "1.0",
+                    "1.0",
+                    "6",
+                    "6",
+                    "2",
+                ],
+                [
+                    "2026-02-23T00:00:02+00:00",
+                    "3000",
+                    "2026-02-23T00:00:02+00:00",
+                    "3000",
+                    "BTC/EUR",
+                    "100.2",
+                    "101.2",
+                    "1.0",
+                    "1.0",
+                    "7",
+                    "7",
+                    "3",
+                ],
+            ],
+        )
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmpdir.cleanup()
+
+    def test_strict_pass_clean_fixture(self) -> None:
+        result = _run_qa(self.qa, self.clean_path)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertIn("qa_status=PASS", result.stdout)
+
+    def test_strict_fail_backward_jump(self) -> None:
+        result = _run_qa(self.qa, self.backward_jump_path)
+        self.assertEqual(result.returncode, 2, result.stdout)
+        self.assertIn("qa_status=FAIL", result.stdout)
+
+    def test_skips_unparseable_rows(self) -> None:
+        result = _run_qa(self.qa, self.unparseable_path)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertIn("samples=1", result.stdout)
+
+    def test_over_wide_first_row_does_not_shift_columns(self) -> None:
+        result = _run_qa(self.qa, self.over_wide_first_row_path)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertIn("start=2026-02-23T00:00:00+00:00", result.stdout)
+        self.assertIn("samples=3", result.stdout)
+
+    def test_top_k_desc_keeps_ties_in_file_order(self) -> None:
+        qa = self.qa
+        ages = np.array([3.0, 9.0, 5.0, 9.0, 5.0, 1.0])
+        self.assertEqual(qa.top_k_desc(ages, 3).tolist(), [1, 3, 2])
+        self.assertEqual(qa.top_k_desc(ages, 0).tolist(), [])
+        self.assertEqual(qa.top_k_desc(ages, 10).tolist(), [1, 3, 2, 4, 0, 5])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from _loader import load_module
+
+
+class LttbTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Both scripts carry their own copy of lttb_indices; check each.
+        cls.modules = (
+            load_module("mm_core_visualize_bbo", "visualize_bbo.py"),
+            load_module("mm_core_visualize_bbo_interactive", "visualize_bbo_interactive.py"),
+        )
+
+    def test_lttb_returns_n_out_increasing_indices_with_endpoints(self) -> None:
+        rng = np.random.default_rng(7)
+        x = np.cumsum(rng.random(1_000))
+        y = np.cumsum(rng.normal(size=1_000))
+        for module in self.modules:
+            with self.subTest(module=module.__name__):
+                idx = module.lttb_indices(x, y, 37)
+                self.assertEqual(idx.size, 37)
+                self.assertTrue(np.all(np.diff(idx) > 0))
+                self.assertEqual(idx[0], 0)
+                self.assertEqual(idx[-1], x.size - 1)
+
+    def test_lttb_keeps_a_spike_a_stride_would_drop(self) -> None:
+        x = np.arange(100, dtype=np.float64)
+        y = np.zeros(100)
+        y[53] = 10.0
+        self.assertNotIn(53, np.arange(0, 100, 10))
+        for module in self.modules:
+            with self.subTest(module=module.__name__):
+                self.assertIn(53, module.lttb_indices(x, y, 10))
+
+    def test_lttb_is_identity_when_nothing_to_drop(self) -> None:
+        x = np.arange(5, dtype=np.float64)
+        y = np.array([1.0, 3.0, 2.0, 5.0, 4.0])
+        for module in self.modules:
+            with self.subTest(module=module.__name__):
+                np.testing.assert_array_equal(module.lttb_indices(x, y, 5), np.arange(5))
+                np.testing.assert_array_equal(module.lttb_indices(x, y, 50), np.arange(5))
+
+
+class RenderPlotsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.vis = load_module("mm_core_visualize_bbo", "visualize_bbo.py")
+
+    def _write_capture(self, path: Path) -> None:
+        lines = ["capture_time_utc,bid,ask,bid_qty,ask_qty"]
+        lines += [f"2026-02-22T15:26:{i:02d}.000000Z,{100 + i},{101 + i},1.0,2.0" for i in range(6)]
+        lines.insert(3, "2026-02-22T15:27:00.000000Z,bad,101,1.0,2.0")
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def test_render_plots_writes_both_pngs_in_process(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "capture.csv"
+            self._write_capture(csv_path)
+            plots = self.vis.render_plots(csv_path, Path(tmp) / "plots", max_points=4)
+            self.assertEqual(plots.samples_plotted, 4)
+            self.assertTrue(plots.bid_ask_path.is_file())
+            self.assertTrue(plots.mids_path.is_file())
+
+    def test_render_plots_reports_missing_matplotlib(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(self.vis, "plt", None):
+            csv_path = Path(tmp) / "capture.csv"
+            self._write_capture(csv_path)
+            with self.assertRaisesRegex(ModuleNotFoundError, "matplotlib"):
+                self.vis.render_plots(csv_path, Path(tmp) / "plots")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,148 +4,164 @@
 from __future__ import annotations
 
 import argparse
-import csv
-from dataclasses import dataclass
-from datetime import datetime
+import sys
 from pathlib import Path
-
-
-@dataclass
-class Tick:
-    capture_time: datetime
-    bid: float
-    ask: float
-    bid_qty: float
-    ask_qty: float
-
-    @property
-    def arithmetic_mid(self) -> float:
-        return (self.bid + self.ask) / 2.0
-
-    @property
-    def size_weighted_mid(self) -> float:
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+try:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+except ModuleNotFoundError:  # reported by main() and render_plots()
+    mdates = plt = None
+
+TICK_SCHEMA = {
+    "capture_time_utc": pa.timestamp("us", tz="UTC"),
+    "bid": pa.float64(),
+    "ask": pa.float64(),
+    "bid_qty": pa.float64(),
+    "ask_qty": pa.float64(),
+}
+
+
+class TickColumns(NamedTuple):
+    """Parallel per-tick arrays; capture_time is datetime64[us] in UTC."""
+
+    capture_time: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_qty: np.ndarray
+    ask_qty: np.ndarray
+
+    def take(self, idx: np.ndarray) -> TickColumns:
+        return TickColumns(*(col[idx] for col in self))
+
+    def mids(self) -> tuple[np.ndarray, np.ndarray]:
+        """Arithmetic and size-weighted mids; the weighted one falls back where both sizes are 0."""
+        mid = (self.bid + self.ask) / 2.0
         denom = self.bid_qty + self.ask_qty
-        if denom <= 0:
-            return self.arithmetic_mid
         # Microprice-style weighting by opposite queue size.
-        return (self.ask * self.bid_qty + self.bid * self.ask_qty) / denom
+        weighted = np.divide(
+            self.ask * self.bid_qty + self.bid * self.ask_qty,
+            denom,
+            out=mid.copy(),
+            where=denom > 0,
+        )
+        return mid, weighted
 
 
-def parse_float(row: list[str], idx: int) -> float | None:
-    try:
-        return float(row[idx])
-    except (ValueError, IndexError):
-        return None
+TEXT_SCHEMA = dict.fromkeys(TICK_SCHEMA, pa.string())
 
 
-def parse_time(value: str) -> datetime | None:
-    if not value:
-        return None
-    normalized = value.replace("Z", "+00:00")
-    try:
-        return datetime.fromisoformat(normalized)
-    except ValueError:
-        return None
+def coerce_ticks(text: pa.Table | pa.RecordBatch) -> pa.Table | pa.RecordBatch:
+    """Convert text-typed tick columns to TICK_SCHEMA, turning unparseable cells into nulls."""
+    capture = pd.to_datetime(
+        text.column("capture_time_utc").to_pandas(), errors="coerce", utc=True, format="ISO8601"
+    )
+    arrays = [pa.array(capture.dt.as_unit("us"), type=TICK_SCHEMA["capture_time_utc"])]
+    for name in list(TICK_SCHEMA)[1:]:
+        values = pd.to_numeric(text.column(name).to_pandas(), errors="coerce")
+        arrays.append(pa.array(values, type=pa.float64(), from_pandas=True))
+    return type(text).from_arrays(arrays, schema=pa.schema(TICK_SCHEMA))
+
+
+def read_tick_table(path: Path, column_types: dict[str, pa.DataType]) -> pa.Table:
+    return pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=8 << 20),
+        # Rows with the wrong field count (e.g. a torn final line) are dropped, not fatal.
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(TICK_SCHEMA), column_types=column_types
+        ),
+    )
 
 
-def load_ticks(path: Path) -> list[Tick]:
-    with path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        if not header:
-            return []
+def load_ticks(path: Path) -> TickColumns:
+    if path.stat().st_size == 0:
+        return TickColumns(np.empty(0, "datetime64[us]"), *(np.empty(0) for _ in range(4)))
+    try:
         try:
-            idx_capture = header.index("capture_time_utc")
-            idx_bid = header.index("bid")
-            idx_ask = header.index("ask")
-            idx_bid_qty = header.index("bid_qty")
-            idx_ask_qty = header.index("ask_qty")
-        except ValueError:
-            raise RuntimeError("missing expected columns in CSV header")
-
-        ticks: list[Tick] = []
-        for row in reader:
-            ts = parse_time(row[idx_capture] if len(row) > idx_capture else "")
-            bid = parse_float(row, idx_bid)
-            ask = parse_float(row, idx_ask)
-            bid_qty = parse_float(row, idx_bid_qty)
-            ask_qty = parse_float(row, idx_ask_qty)
-            if None in (ts, bid, ask, bid_qty, ask_qty):
-                continue
-            ticks.append(
-                Tick(
-                    capture_time=ts,  # type: ignore[arg-type]
-                    bid=bid,  # type: ignore[arg-type]
-                    ask=ask,  # type: ignore[arg-type]
-                    bid_qty=bid_qty,  # type: ignore[arg-type]
-                    ask_qty=ask_qty,  # type: ignore[arg-type]
-                )
-            )
-    return ticks
-
-
-def downsample(ticks: list[Tick], max_points: int) -> list[Tick]:
-    if max_points <= 0 or len(ticks) <= max_points:
+            table = read_tick_table(path, TICK_SCHEMA)
+        except pa.ArrowInvalid:
+            # A non-numeric cell or repeated header line: reparse as text and skip bad rows.
+            table = coerce_ticks(read_tick_table(path, TEXT_SCHEMA))
+    except pa.ArrowKeyError as exc:
+        raise RuntimeError("missing expected columns in CSV header") from exc
+    except pa.ArrowInvalid as exc:
+        raise RuntimeError(f"unparseable CSV: {exc}") from exc
+    table = table.drop_null()
+    return TickColumns(*(table.column(name).to_numpy() for name in TICK_SCHEMA))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: ``n_out`` indices that keep the visual shape of y(x).
+
+    The first and last points are always kept; every interior bucket keeps the point forming
+    the largest triangle with the previous pick and the next bucket's centroid.
+    """
+    n = x.size
+    n_out = max(n_out, 3)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    centroid_x = np.append(np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / counts, x[-1])
+    centroid_y = np.append(np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / counts, y[-1])
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0] = a = 0
+    idx[-1] = n - 1
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = centroid_x[i + 1], centroid_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(ticks: TickColumns, max_points: int) -> TickColumns:
+    if max_points <= 0 or ticks.bid.size <= max_points:
         return ticks
-    stride = max(1, len(ticks) // max_points)
-    sampled = ticks[::stride]
-    if sampled[-1] is not ticks[-1]:
-        sampled.append(ticks[-1])
-    return sampled
+    # Shape-preserving selection driven by the mid; all series share the chosen ticks.
+    x = (ticks.capture_time - ticks.capture_time[0]).astype(np.float64)
+    return ticks.take(lttb_indices(x, (ticks.bid + ticks.ask) / 2.0, max_points))
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("--file", required=True, help="Input CSV file from collector.")
-    parser.add_argument(
-        "--outdir",
-        default="mm_core/out/plots",
-        help="Directory for PNG outputs (default: mm_core/out/plots).",
-    )
-    parser.add_argument(
-        "--max-points",
-        type=int,
-        default=20_000,
-        help="Downsample cap for plotting large files (default: 20000).",
-    )
-    parser.add_argument(
-        "--prefix",
-        default=None,
-        help="Optional output filename prefix (default: input file stem).",
-    )
-    args = parser.parse_args()
+class RenderedPlots(NamedTuple):
+    samples_plotted: int
+    bid_ask_path: Path
+    mids_path: Path
 
-    path = Path(args.file)
-    if not path.exists():
-        print(f"file not found: {path}")
-        return 1
 
-    try:
-        import matplotlib
+def render_plots(
+    csv_path: Path, outdir: Path, max_points: int = 20_000, prefix: str | None = None
+) -> RenderedPlots | None:
+    """Write the bid/ask and mid PNGs for one capture; None when it has no valid rows.
 
-        matplotlib.use("Agg")
-        import matplotlib.dates as mdates
-        import matplotlib.pyplot as plt
-    except ModuleNotFoundError:
-        print("matplotlib is required. Install with:")
-        print(r"test_venv\Scripts\python.exe -m pip install -r mm_core\requirements.txt")
-        return 2
-
-    ticks = load_ticks(path)
-    if not ticks:
-        print("no valid rows found")
-        return 1
-    ticks = downsample(ticks, args.max_points)
+    Callable in-process so a driver can plot many captures while reusing one interpreter.
+    """
+    if plt is None:
+        raise ModuleNotFoundError("matplotlib is required to render plots")
+    ticks = load_ticks(csv_path)
+    if ticks.bid.size == 0:
+        return None
+    ticks = downsample(ticks, max_points)
 
-    times = [t.capture_time for t in ticks]
-    bids = [t.bid for t in ticks]
-    asks = [t.ask for t in ticks]
-    mids = [t.arithmetic_mid for t in ticks]
-    sw_mids = [t.size_weighted_mid for t in ticks]
+    times = ticks.capture_time
+    bids = ticks.bid
+    asks = ticks.ask
+    mids, sw_mids = ticks.mids()
 
-    outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
-    prefix = args.prefix or path.stem
+    prefix = prefix or csv_path.stem
 
     fig, ax = plt.subplots(figsize=(14, 6))
     ax.plot(times, bids, label="bid", linewidth=1.0)
@@ -177,11 +193,50 @@ def main() -> int:
     fig.savefig(mids_path, dpi=140)
     plt.close(fig)
 
-    print(f"samples_plotted={len(ticks)}")
-    print(f"bid_ask_plot={bid_ask_path}")
-    print(f"mids_plot={mids_path}")
+    return RenderedPlots(ticks.bid.size, bid_ask_path, mids_path)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", required=True, help="Input CSV file from collector.")
+    parser.add_argument(
+        "--outdir",
+        default="mm_core/out/plots",
+        help="Directory for PNG outputs (default: mm_core/out/plots).",
+    )
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=20_000,
+        help="Downsample cap for plotting large files (default: 20000).",
+    )
+    parser.add_argument(
+        "--prefix",
+        default=None,
+        help="Optional output filename prefix (default: input file stem).",
+    )
+    args = parser.parse_args(argv)
+
+    path = Path(args.file)
+    if not path.exists():
+        print(f"file not found: {path}")
+        return 1
+
+    if plt is None:
+        print("matplotlib is required. Install with:")
+        print(r"test_venv\Scripts\python.exe -m pip install -r mm_core\requirements.txt")
+        return 2
+
+    plots = render_plots(path, Path(args.outdir), args.max_points, args.prefix)
+    if plots is None:
+        print("no valid rows found")
+        return 1
+
+    print(f"samples_plotted={plots.samples_plotted}")
+    print(f"bid_ask_plot={plots.bid_ask_path}")
+    print(f"mids_plot={plots.mids_path}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
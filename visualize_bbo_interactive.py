@@ -4,84 +4,134 @@
 from __future__ import annotations
 
 import argparse
-import csv
-from dataclasses import dataclass
-from datetime import date, datetime
+from datetime import UTC, date, datetime, time, timedelta
 from pathlib import Path
-
-
-@dataclass
-class Tick:
-    capture_time: datetime
-    bid: float
-    ask: float
-    bid_qty: float
-    ask_qty: float
-
-    @property
-    def arithmetic_mid(self) -> float:
-        return (self.bid + self.ask) / 2.0
-
-    @property
-    def weighted_mid(self) -> float:
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+TICK_SCHEMA = {
+    "capture_time_utc": pa.timestamp("us", tz="UTC"),
+    "bid": pa.float64(),
+    "ask": pa.float64(),
+    "bid_qty": pa.float64(),
+    "ask_qty": pa.float64(),
+}
+
+
+class TickColumns(NamedTuple):
+    """Parallel per-tick arrays; capture_time is datetime64[us] in UTC."""
+
+    capture_time: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    bid_qty: np.ndarray
+    ask_qty: np.ndarray
+
+    def take(self, idx: np.ndarray) -> TickColumns:
+        return TickColumns(*(col[idx] for col in self))
+
+    def mids(self) -> tuple[np.ndarray, np.ndarray]:
+        """Arithmetic and size-weighted mids; the weighted one falls back where both sizes are 0."""
+        mid = (self.bid + self.ask) / 2.0
         denom = self.bid_qty + self.ask_qty
-        if denom <= 0:
-            return self.arithmetic_mid
         # Microprice-style weighted mid.
-        return (self.ask * self.bid_qty + self.bid * self.ask_qty) / denom
+        weighted = np.divide(
+            self.ask * self.bid_qty + self.bid * self.ask_qty,
+            denom,
+            out=mid.copy(),
+            where=denom > 0,
+        )
+        return mid, weighted
 
 
-def parse_time(value: str) -> datetime | None:
-    if not value:
-        return None
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
+TEXT_SCHEMA = dict.fromkeys(TICK_SCHEMA, pa.string())
 
 
-def parse_float(row: list[str], idx: int) -> float | None:
+def coerce_ticks(text: pa.Table | pa.RecordBatch) -> pa.Table | pa.RecordBatch:
+    """Convert text-typed tick columns to TICK_SCHEMA, turning unparseable cells into nulls."""
+    capture = pd.to_datetime(
+        text.column("capture_time_utc").to_pandas(), errors="coerce", utc=True, format="ISO8601"
+    )
+    arrays = [pa.array(capture.dt.as_unit("us"), type=TICK_SCHEMA["capture_time_utc"])]
+    for name in list(TICK_SCHEMA)[1:]:
+        values = pd.to_numeric(text.column(name).to_pandas(), errors="coerce")
+        arrays.append(pa.array(values, type=pa.float64(), from_pandas=True))
+    return type(text).from_arrays(arrays, schema=pa.schema(TICK_SCHEMA))
+
+
+def read_day_batches(
+    path: Path, day_start: pa.Scalar, day_end: pa.Scalar, coerce: bool
+) -> list[pa.RecordBatch]:
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=8 << 20),
+        # Rows with the wrong field count (e.g. a torn final line) are dropped, not fatal.
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(TICK_SCHEMA),
+            column_types=TEXT_SCHEMA if coerce else TICK_SCHEMA,
+        ),
+    )
+    # Filter each block as it is parsed so only the selected day is ever held in memory.
+    batches = []
+    for batch in reader:
+        if coerce:
+            batch = coerce_ticks(batch)
+        ts = batch.column("capture_time_utc")
+        batches.append(batch.filter(pc.and_(pc.greater_equal(ts, day_start), pc.less(ts, day_end))))
+    return batches
+
+
+def load_ticks(path: Path, day: date) -> TickColumns:
+    """Stream the CSV in blocks and keep only ticks captured on ``day`` (UTC)."""
+    if path.stat().st_size == 0:
+        return TickColumns(np.empty(0, "datetime64[us]"), *(np.empty(0) for _ in range(4)))
+    ts_type = TICK_SCHEMA["capture_time_utc"]
+    day_start = pa.scalar(datetime.combine(day, time(), tzinfo=UTC), type=ts_type)
+    day_end = pa.scalar(datetime.combine(day + timedelta(days=1), time(), tzinfo=UTC), type=ts_type)
     try:
-        return float(row[idx])
-    except (ValueError, IndexError):
-        return None
-
-
-def load_ticks(path: Path) -> list[Tick]:
-    with path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        if not header:
-            return []
-
         try:
-            i_ts = header.index("capture_time_utc")
-            i_bid = header.index("bid")
-            i_ask = header.index("ask")
-            i_bid_qty = header.index("bid_qty")
-            i_ask_qty = header.index("ask_qty")
-        except ValueError as exc:
-            raise RuntimeError(f"missing expected column in CSV: {exc}") from exc
-
-        ticks: list[Tick] = []
-        for row in reader:
-            ts = parse_time(row[i_ts] if len(row) > i_ts else "")
-            bid = parse_float(row, i_bid)
-            ask = parse_float(row, i_ask)
-            bid_qty = parse_float(row, i_bid_qty)
-            ask_qty = parse_float(row, i_ask_qty)
-            if None in (ts, bid, ask, bid_qty, ask_qty):
-                continue
-            ticks.append(
-                Tick(
-                    capture_time=ts,  # type: ignore[arg-type]
-                    bid=bid,  # type: ignore[arg-type]
-                    ask=ask,  # type: ignore[arg-type]
-                    bid_qty=bid_qty,  # type: ignore[arg-type]
-                    ask_qty=ask_qty,  # type: ignore[arg-type]
-                )
-            )
-    return ticks
+            batches = read_day_batches(path, day_start, day_end, coerce=False)
+        except pa.ArrowInvalid:
+            # A non-numeric cell or repeated header line: reparse as text and skip bad rows.
+            batches = read_day_batches(path, day_start, day_end, coerce=True)
+    except pa.ArrowKeyError as exc:
+        raise RuntimeError(f"missing expected column in CSV: {exc}") from exc
+    except pa.ArrowInvalid as exc:
+        raise RuntimeError(f"unparseable CSV: {exc}") from exc
+    table = pa.Table.from_batches(batches, schema=pa.schema(TICK_SCHEMA)).drop_null()
+    return TickColumns(*(table.column(name).to_numpy() for name in TICK_SCHEMA))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: ``n_out`` indices that keep the visual shape of y(x).
+
+    The first and last points are always kept; every interior bucket keeps the point forming
+    the largest triangle with the previous pick and the next bucket's centroid.
+    """
+    n = x.size
+    n_out = max(n_out, 3)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    centroid_x = np.append(np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / counts, x[-1])
+    centroid_y = np.append(np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / counts, y[-1])
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0] = a = 0
+    idx[-1] = n - 1
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = centroid_x[i + 1], centroid_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return idx
 
 
 def main() -> int:
@@ -101,7 +151,7 @@ def main() -> int:
         "--max-points",
         type=int,
         default=120_000,
-        help="Max points to plot after stride downsampling (default: 120000).",
+        help="Max points to plot after LTTB downsampling (default: 120000).",
     )
     args = parser.parse_args()
 
@@ -123,32 +173,32 @@ def main() -> int:
         print(r"test_venv\Scripts\python.exe -m pip install -r mm_core\requirements.txt")
         return 2
 
-    ticks = load_ticks(in_path)
-    day_ticks = [t for t in ticks if t.capture_time.date() == selected_date]
-    if not day_ticks:
+    day_ticks = load_ticks(in_path, selected_date)
+    n = day_ticks.bid.size
+    if n == 0:
         print(f"no rows found for date={selected_date.isoformat()} in {in_path}")
         return 1
 
-    if args.max_points > 0 and len(day_ticks) > args.max_points:
-        stride = max(1, len(day_ticks) // args.max_points)
-        day_ticks = day_ticks[::stride]
-        last_for_day = day_ticks[-1]
-        if last_for_day.capture_time.date() == selected_date:
-            day_full = [t for t in ticks if t.capture_time.date() == selected_date]
-            if day_full and day_full[-1].capture_time != last_for_day.capture_time:
-                day_ticks.append(day_full[-1])
-
-    times = [t.capture_time for t in day_ticks]
-    bids = [t.bid for t in day_ticks]
-    asks = [t.ask for t in day_ticks]
-    mids = [t.arithmetic_mid for t in day_ticks]
-    w_mids = [t.weighted_mid for t in day_ticks]
+    if args.max_points > 0 and n > args.max_points:
+        # Shape-preserving selection driven by the mid; all series share the chosen ticks.
+        x = (day_ticks.capture_time - day_ticks.capture_time[0]).astype(np.float64)
+        mid = (day_ticks.bid + day_ticks.ask) / 2.0
+        day_ticks = day_ticks.take(lttb_indices(x, mid, args.max_points))
+
+    times = day_ticks.capture_time
+    bids = day_ticks.bid
+    asks = day_ticks.ask
+    mids, w_mids = day_ticks.mids()
 
     fig = go.Figure()
-    fig.add_trace(go.Scattergl(x=times, y=bids, mode="lines", name="Bid"))
-    fig.add_trace(go.Scattergl(x=times, y=asks, mode="lines", name="Ask"))
-    fig.add_trace(go.Scattergl(x=times, y=mids, mode="lines", name="Arithmetic Mid"))
-    fig.add_trace(go.Scattergl(x=times, y=w_mids, mode="lines", name="Size-Weighted Mid"))
+    fig.add_traces(
+        [
+            go.Scattergl(x=times, y=bids, mode="lines", name="Bid"),
+            go.Scattergl(x=times, y=asks, mode="lines", name="Ask"),
+            go.Scattergl(x=times, y=mids, mode="lines", name="Arithmetic Mid"),
+            go.Scattergl(x=times, y=w_mids, mode="lines", name="Size-Weighted Mid"),
+        ]
+    )
 
     fig.update_layout(
         title=f"BBO and Mid Series ({selected_date.isoformat()} UTC)",
@@ -163,9 +213,10 @@ def main() -> int:
     default_out = Path("mm_core/out/plots") / f"{in_path.stem}_{selected_date.isoformat()}_interactive.html"
     out_path = Path(args.out) if args.out else default_out
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    fig.write_html(out_path, include_plotlyjs="cdn")
+    # Traces were validated on construction; skip the second pass over every point.
+    fig.write_html(out_path, include_plotlyjs="cdn", validate=False)
 
-    print(f"samples_plotted={len(day_ticks)}")
+    print(f"samples_plotted={day_ticks.bid.size}")
     print(f"out_html={out_path}")
     print("tip: click legend names to toggle traces; use wheel/box zoom to inspect microstructure.")
     return 0